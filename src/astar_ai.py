@@ -1,10 +1,27 @@
-from player import Player
+import bitboard
+from collections import namedtuple
+from heuristics import HEURISTICS
+from itertools import count
+from player import Player, check_deadline
+from transposition import SearchTree, TranspositionTable
 import heapq
 
+# Priority queue entry. Equal priorities fall back to the insertion counter, which
+# is unique, so the heap never compares boards. The board (already a compact packed
+# key) and the move path live in the search tree, reached through index.
+QueueEntry = namedtuple("QueueEntry", ["priority", "order", "index"])
+
 class AStarPlayer(Player):
-    def __init__(self, game, heuristic_choice):
+    def __init__(self, game, heuristic_choice, table_size=200000, time_budget=None):
         self.game = game
+        self.time_budget = time_budget  # Seconds per move; None searches a fixed depth
+        # Values from shallower searches of the same move, reused while deepening, so only
+        # needed with a time budget. Searches never spawn tiles, so no board of one turn
+        # comes up again on the next.
+        self.table = TranspositionTable(table_size) if time_budget is not None else None
         self.heuristic_function = self.get_heuristic(heuristic_choice)
+        self.heuristic = HEURISTICS.get(heuristic_choice, HEURISTICS["empty_tiles"])
+        self.heuristic.terms(0)  # Build the line tables now rather than during the first move
 
     def get_heuristic(self, heuristic_choice):
         """Select the heuristic function based on user input."""
@@ -18,86 +35,72 @@ class AStarPlayer(Player):
 
     def heuristic_empty_tiles(self, board):
         """Heuristic: Number of empty tiles."""
-        return sum(tile == 0 for row in board for tile in row)
+        return HEURISTICS["empty_tiles"](bitboard.pack(board))
 
     def heuristic_max_tile(self, board):
         """Heuristic: Maximum tile value."""
-        return max(tile for row in board for tile in row)
+        return HEURISTICS["max_tile"](bitboard.pack(board))
 
     def heuristic_monotonicity(self, board):
         """Heuristic: Penalize non-monotonic sequences."""
-        penalty = 0
-        for row in board:
-            for i in range(len(row) - 1):
-                if row[i] > row[i + 1]:
-                    penalty += 1
-        return penalty
+        return HEURISTICS["monotonicity"](bitboard.pack(board))
 
     def heuristic_clustering(self, board):
         """Heuristic: Penalize large tiles being far apart."""
-        penalty = 0
-        for i in range(len(board)):
-            for j in range(len(board[i])):
-                if board[i][j] > 0:
-                    neighbors = self.get_neighbors(board, i, j)
-                    penalty += sum(abs(board[i][j] - n) for n in neighbors)
-        return penalty
-
-    def get_neighbors(self, board, i, j):
-        """Get the neighbors of a tile at position (i, j)."""
-        neighbors = []
-        if i > 0:
-            neighbors.append(board[i - 1][j])
-        if i < len(board) - 1:
-            neighbors.append(board[i + 1][j])
-        if j > 0:
-            neighbors.append(board[i][j - 1])
-        if j < len(board[i]) - 1:
-            neighbors.append(board[i][j + 1])
-        return neighbors
-
-    def astar(self):
-        """Perform A* search to find the best move."""
-        priority_queue = []
-        initial_heuristic = self.heuristic_function(self.game.board)
-        heapq.heappush(priority_queue, (initial_heuristic, self.game.board, self.game.score, []))
-        best_score = self.game.score
-        best_moves = []
+        return HEURISTICS["clustering"](bitboard.pack(board))
+
+    def astar(self, max_depth=3, deadline=None):
+        """Perform A* search to find the best move.
+
+        The depth is limited to avoid long computations. Raises SearchTimeout if the
+        deadline passes before the search finishes.
+        """
+        stats = self.stats
+        table = self.table
+        cache_hits = table.hits if table is not None else 0
+        root = bitboard.pack(self.game.board)
+        tree = SearchTree(root, max_depth, key=None)
+        heuristic = self.heuristic
+        node_terms = [heuristic.terms(root)]  # Line terms of every node, by tree index
+        order = count()
+        priority_queue = [QueueEntry(heuristic.value(node_terms[0]), next(order), 0)]
 
         while priority_queue:
-            _, board, score, moves = heapq.heappop(priority_queue)
-
-            if len(moves) >= 3:  # Limit the depth to avoid long computations
-                if score > best_score:
-                    best_score = score
-                    best_moves = moves
+            check_deadline(deadline)
+            if stats is not None:
+                stats.frontier(len(priority_queue))
+            index = heapq.heappop(priority_queue).index
+            if not tree.resolve(index, table):
                 continue
 
-            for move_func, move_name in [
-                (self.game.move_left, 'left'),
-                (self.game.move_right, 'right'),
-                (self.game.move_up, 'up'),
-                (self.game.move_down, 'down')
-            ]:
-                temp_board = [row[:] for row in self.game.board]
-                temp_score = self.game.score
-
-                self.game.board = board
-                self.game.score = score
-                move_func()
-
-                if self.game.board != temp_board:
-                    heuristic_value = self.heuristic_function(self.game.board)
+            if stats is not None:
+                stats.nodes_expanded += 1
+            board = tree.boards[index]
+            terms = node_terms[index]
+            for move_name, move in bitboard.MASK_MOVES[bitboard.legal_moves(board)]:
+                new_board, gained = move(board)
+                new_terms = heuristic.update(terms, board, new_board, move_name)
+                node_terms.append(new_terms)
+                child = tree.add(index, new_board, move_name, gained)
+                if not tree.shared(child):
                     heapq.heappush(
                         priority_queue,
-                        (heuristic_value, self.game.board, self.game.score, moves + [move_name])
+                        QueueEntry(heuristic.value(new_terms), next(order), child)
                     )
+                elif stats is not None:
+                    stats.cache_hits += 1
+                if stats is not None:
+                    stats.generated(new_board)
+                    stats.heuristic_calls += 1
 
-                self.game.board = temp_board
-                self.game.score = temp_score
-
-        return best_moves[0] if best_moves else None
+        if stats is not None and table is not None:
+            stats.cache_hits += table.hits - cache_hits
+        best_move, best_gain = tree.backup(table)
+        return best_move if best_gain > 0 else None
 
     def get_best_move(self):
         """Return the best move using A*."""
-        return self.astar()
+        if self.time_budget is not None:
+            self.table.clear()  # Nothing from earlier turns can match this turn's boards
+            return self.legal_move(self.iterative_deepening(self.astar, self.time_budget))
+        return self.legal_move(self.astar())
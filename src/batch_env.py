@@ -0,0 +1,175 @@
+"""
+Vectorized 2048 simulator that advances many games at once with NumPy.
+
+Boards are held as an (N, 4, 4) uint8 array of tile exponents (0 for empty,
+1 for 2, 2 for 4, ...), the same encoding as bitboard.py. Moves go through
+the precomputed row tables, so a step costs a handful of array operations
+regardless of N.
+"""
+
+import time
+
+import numpy as np
+
+from game_logic import DIRECTIONS, FOUR_PROBABILITY
+from row_tables import ROW_LEFT, ROW_SCORE
+
+ROW_LEFT_ARRAY = np.array(ROW_LEFT, dtype=np.uint16)
+ROW_SCORE_ARRAY = np.array(ROW_SCORE, dtype=np.int64)
+NIBBLE_SHIFTS = np.array([0, 4, 8, 12], dtype=np.uint16)
+
+
+def _orient(boards, direction):
+    """View the boards so that the given move slides every row to the left."""
+    if direction == 0:  # left
+        return boards
+    if direction == 1:  # right
+        return boards[:, :, ::-1]
+    if direction == 2:  # up
+        return boards.transpose(0, 2, 1)
+    return boards.transpose(0, 2, 1)[:, :, ::-1]  # down
+
+
+def slide(boards, direction):
+    """Slide every board in one direction without spawning.
+
+    direction is an index into game_logic.DIRECTIONS. Returns (new_boards,
+    gained, changed) with gained and changed holding one entry per board.
+    """
+    rows = _orient(boards, direction).astype(np.uint16)
+    keys = (rows << NIBBLE_SHIFTS).sum(axis=2, dtype=np.uint16)
+    slid = ((ROW_LEFT_ARRAY[keys][..., None] >> NIBBLE_SHIFTS) & 0xF).astype(np.uint8)
+    gained = ROW_SCORE_ARRAY[keys].sum(axis=1)
+
+    new_boards = np.empty_like(boards)
+    _orient(new_boards, direction)[...] = slid  # Writing through the view undoes the orientation
+    changed = (new_boards != boards).any(axis=(1, 2))
+    return new_boards, gained, changed
+
+
+def legal_moves(boards):
+    """Return an (N, 4) bool array of the directions that would change each board."""
+    return np.stack([slide(boards, direction)[2] for direction in range(len(DIRECTIONS))], axis=1)
+
+
+def is_game_over(boards):
+    """Return an (N,) bool array, True where no move can change the board."""
+    has_empty = (boards == 0).any(axis=(1, 2))
+    horizontal_pair = (boards[:, :, :-1] == boards[:, :, 1:]).any(axis=(1, 2))
+    vertical_pair = (boards[:, :-1, :] == boards[:, 1:, :]).any(axis=(1, 2))
+    return ~(has_empty | horizontal_pair | vertical_pair)
+
+
+def spawn(boards, rng, mask=None):
+    """Add a random tile to an empty cell of every (selected) board, in place."""
+    flat = boards.reshape(len(boards), 16)
+    empty = flat == 0
+    selected = empty.any(axis=1)
+    if mask is not None:
+        selected &= mask
+    indices = np.flatnonzero(selected)
+    if not len(indices):
+        return
+    # The empty cell with the largest random key is a uniform pick among the empty cells
+    keys = rng.random((len(indices), 16)) * empty[indices]
+    cells = keys.argmax(axis=1)
+    exponents = np.ones(len(indices), dtype=np.uint8)
+    if FOUR_PROBABILITY:
+        exponents[rng.random(len(indices)) < FOUR_PROBABILITY] = 2
+    flat[indices, cells] = exponents
+
+
+def random_moves(legal, rng):
+    """Pick a uniformly random legal direction for every row of an (N, 4) legal-move array.
+
+    Rows with no legal move get direction 0.
+    """
+    # The legal direction with the largest random key is a uniform pick among them
+    return (rng.random(legal.shape) * legal).argmax(axis=1)
+
+
+def playout(boards, rng, max_moves=None, deadline=None):
+    """Play every board on with uniformly random legal moves until no move is left.
+
+    A tile spawns after every move, as in the game. Returns an (N,) array of the
+    score each board gains; max_moves caps the number of moves per board, and
+    play also stops once a deadline (a time.perf_counter() value) has passed.
+    The boards array itself is left unchanged.
+    """
+    gained = np.zeros(len(boards), dtype=np.int64)
+    active = np.arange(len(boards))  # Original positions of the games still going
+    boards = boards.copy()
+    moves = 0
+    while len(active) and (max_moves is None or moves < max_moves):
+        if deadline is not None and time.perf_counter() > deadline:
+            break
+        # Every direction is slid once; the chosen one is then picked out per board
+        results = [slide(boards, direction) for direction in range(len(DIRECTIONS))]
+        legal = np.stack([changed for _, _, changed in results], axis=1)
+        alive = legal.any(axis=1)
+        if not alive.all():
+            boards, legal, active = boards[alive], legal[alive], active[alive]
+            results = [(new[alive], score[alive], None) for new, score, _ in results]
+            if not len(active):
+                break
+        actions = random_moves(legal, rng)
+        rows = np.arange(len(active))
+        boards = np.stack([new for new, _, _ in results])[actions, rows]
+        gained[active] += np.stack([score for _, score, _ in results])[actions, rows]
+        spawn(boards, rng)
+        moves += 1
+    return gained
+
+
+class BatchGame2048:
+    """N independent games of 2048 stepped together."""
+
+    def __init__(self, n, seed=None):
+        """Create n games; seed is an int, None or a NumPy Generator."""
+        self.rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+        self.boards = np.zeros((n, 4, 4), dtype=np.uint8)
+        self.scores = np.zeros(n, dtype=np.int64)
+        self.done = np.zeros(n, dtype=bool)
+        self.reset()
+
+    def __len__(self):
+        return len(self.boards)
+
+    def reset(self):
+        """Reset every board and add two random tiles to each."""
+        self.boards[...] = 0
+        self.scores[...] = 0
+        spawn(self.boards, self.rng)
+        spawn(self.boards, self.rng)
+        self.done = is_game_over(self.boards)
+
+    def step(self, actions):
+        """Apply one move per game, given as direction indices, to every unfinished game.
+
+        Games whose move changes the board score its merges and get a new tile;
+        finished games are left untouched. Returns (gained, changed) per game.
+        """
+        actions = np.asarray(actions)
+        gained = np.zeros(len(self.boards), dtype=np.int64)
+        changed = np.zeros(len(self.boards), dtype=bool)
+        for direction in range(len(DIRECTIONS)):
+            selected = np.flatnonzero((actions == direction) & ~self.done)
+            if not len(selected):
+                continue
+            new_boards, move_gained, move_changed = slide(self.boards[selected], direction)
+            self.boards[selected] = new_boards
+            gained[selected] = move_gained
+            changed[selected] = move_changed
+
+        self.scores += gained
+        spawn(self.boards, self.rng, changed)
+        self.done |= is_game_over(self.boards)
+        return gained, changed
+
+    def legal_moves(self):
+        """Return an (N, 4) bool array of moves that would change each board."""
+        return legal_moves(self.boards)
+
+    def tiles(self):
+        """Return the boards as tile values instead of exponents."""
+        return np.where(self.boards > 0, 1 << self.boards.astype(np.int64), 0)
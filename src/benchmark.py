@@ -0,0 +1,222 @@
+"""
+Benchmark suite for the game engine and the search players.
+
+Measures engine moves per second in each direction, is_game_over cost,
+search nodes per second for every player and A* heuristic, and full games
+per second from fixed seeds. Results are written as JSON so runs on
+different commits can be compared:
+
+    python3 benchmark.py --output bench.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+import bitboard
+from astar_ai import AStarPlayer
+from bfs_ai import BFSPlayer
+from dfs_ai import DFSPlayer, PrunedDFSPlayer
+from expectimax_ai import ExpectimaxPlayer
+from mcts_ai import MCTSPlayer
+from rollout_ai import RolloutPlayer
+from ntuple_ai import NTuplePlayer
+from game_logic import DIRECTIONS, Game2048, slide
+from run_multiple_strategies import get_all_heuristics, run_game
+from stats import SearchStats
+
+PLAYERS = {
+    "BFS": (BFSPlayer, None),
+    "DFS": (DFSPlayer, None),
+    "Pruned DFS": (PrunedDFSPlayer, None),
+    "Expectimax": (ExpectimaxPlayer, None),
+    "MCTS": (MCTSPlayer, None),
+    "Rollout": (RolloutPlayer, None),
+    "N-tuple": (NTuplePlayer, None),
+}
+for label, player_type in (("DFS", DFSPlayer), ("A*", AStarPlayer)):
+    PLAYERS.update(
+        {f"{label} ({name})": (player_type, key) for name, key in get_all_heuristics().items()}
+    )
+
+
+def sample_boards(count, seed):
+    """Boards from seeded games of random play, restarting whenever a game ends."""
+    rng = random.Random(seed)
+    game = Game2048(seed)
+    boards = []
+    while len(boards) < count:
+        if bitboard.is_game_over(bitboard.pack(game.board)):
+            game = Game2048(rng.randrange(1 << 30))
+        boards.append([row[:] for row in game.board])
+        game.move(rng.choice(DIRECTIONS))
+    return boards
+
+
+def rate(count, seconds):
+    """Operations per second, guarding against a zero-length timing."""
+    return count / seconds if seconds > 0 else float("inf")
+
+
+def bench_engine(boards, repeat):
+    """Moves per second of Game2048 and of the bitboard engine, per direction."""
+    results = {}
+    game = Game2048(0)
+    packed = [bitboard.pack(board) for board in boards]
+    for direction in DIRECTIONS:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for board in boards:
+                game.board = [row[:] for row in board]
+                game.move(direction)
+        game_rate = rate(repeat * len(boards), time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for board in boards:
+                slide(board, direction)
+        slide_rate = rate(repeat * len(boards), time.perf_counter() - start)
+
+        move = bitboard.MOVES[direction]
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for board in packed:
+                move(board)
+        bitboard_rate = rate(repeat * len(packed), time.perf_counter() - start)
+
+        results[direction] = {
+            "game_moves_per_s": game_rate,
+            "slide_per_s": slide_rate,
+            "bitboard_moves_per_s": bitboard_rate,
+        }
+    return results
+
+
+def bench_game_over(boards, repeat):
+    """Average cost of a game-over check, in nanoseconds."""
+    game = Game2048(0)
+    start = time.perf_counter_ns()
+    for _ in range(repeat):
+        for board in boards:
+            game.board = [row[:] for row in board]
+            game.is_game_over()
+    game_ns = (time.perf_counter_ns() - start) / (repeat * len(boards))
+
+    packed = [bitboard.pack(board) for board in boards]
+    start = time.perf_counter_ns()
+    for _ in range(repeat):
+        for board in packed:
+            bitboard.is_game_over(board)
+    bitboard_ns = (time.perf_counter_ns() - start) / (repeat * len(packed))
+    return {"game_ns_per_call": game_ns, "bitboard_ns_per_call": bitboard_ns}
+
+
+def make_player(name, game):
+    """Build one of the benchmarked players for a game."""
+    player_type, heuristic = PLAYERS[name]
+    return player_type(game, heuristic) if heuristic else player_type(game)
+
+
+def bench_players(boards):
+    """Search throughput of every player over the same set of positions."""
+    results = {}
+    for name in PLAYERS:
+        game = Game2048(0)
+        player = make_player(name, game)
+        stats = SearchStats()
+        player.stats = stats
+        for board in boards:
+            game.board = [row[:] for row in board]
+            stats.begin_move()
+            player.get_best_move()
+            stats.end_move()
+        totals = stats.totals()
+        seconds = totals["elapsed_ns"] / 1e9
+        results[name] = {
+            "positions": len(boards),
+            "nodes_per_s": rate(totals["nodes_expanded"], seconds),
+            "boards_per_s": rate(totals["boards_generated"], seconds),
+            "ms_per_move": totals["elapsed_ns"] / len(boards) / 1e6,
+            "counters": totals,
+        }
+    return results
+
+
+def bench_games(games, seed):
+    """Full games per second for every player, from fixed seeds."""
+    results = {}
+    for name, (player_type, heuristic) in PLAYERS.items():
+        scores = []
+        start = time.perf_counter()
+        for i in range(games):
+            scores.append(run_game(player_type, heuristic, seed + i))
+        seconds = time.perf_counter() - start
+        results[name] = {
+            "games": games,
+            "games_per_s": rate(games, seconds),
+            "mean_score": sum(scores) / len(scores),
+            "scores": scores,
+        }
+    return results
+
+
+def git_commit():
+    """Commit hash of the checkout this file is in, or None outside a git checkout."""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL,
+            text=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(positions=200, repeat=5, games=3, seed=0, skip_games=False):
+    """Run the whole suite and return the results as a JSON-serialisable dict."""
+    boards = sample_boards(positions, seed)
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "positions": positions,
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "engine": bench_engine(boards, repeat),
+        "is_game_over": bench_game_over(boards, repeat),
+        "players": bench_players(boards[: max(1, positions // 10)]),
+    }
+    if not skip_games:
+        results["games"] = bench_games(games, seed)
+    return results
+
+
+def parse_args(argv=None):
+    """Parse the benchmark's command-line options."""
+    parser = argparse.ArgumentParser(description="Benchmark the 2048 engine and AI players.")
+    parser.add_argument("--output", help="write JSON results here instead of stdout")
+    parser.add_argument("--positions", type=int, default=200, help="sample positions to time on")
+    parser.add_argument("--repeat", type=int, default=5, help="passes over the positions for engine timings")
+    parser.add_argument("--games", type=int, default=3, help="full games per player")
+    parser.add_argument("--seed", type=int, default=0, help="seed for positions and games")
+    parser.add_argument("--skip-games", action="store_true", help="skip the full-game benchmark")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    results = run_benchmarks(args.positions, args.repeat, args.games, args.seed, args.skip_games)
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
@@ -1,46 +1,97 @@
-from collections import deque
-from player import Player
+from array import array
+import heapq
+
+import bitboard
+from game_logic import DIRECTIONS
+from heuristics import score_evaluator
+from player import Player, check_deadline
 
 class BFSPlayer(Player):
-    def __init__(self, game):
+    def __init__(self, game, heuristic_choice="empty_tiles", time_budget=None, max_frontier=None):
         self.game = game
+        self.time_budget = time_budget  # Seconds per move; None searches a fixed depth
+        # Levels wider than this are cut down to the states ranking best by score plus
+        # heuristic, turning BFS into beam search; None keeps every state
+        self.max_frontier = max_frontier
+        self.evaluate = score_evaluator(heuristic_choice)
 
-    def bfs(self, max_depth=3):
-        """Perform BFS to find the best move up to a given depth."""
-        queue = deque([(self.game.board, self.game.score, [])])
-        best_score = self.game.score
-        best_moves = []
+    def beam(self, boards, scores, roots):
+        """Keep the max_frontier states of a level that rank best by evaluate(), in level order."""
+        evaluate = self.evaluate
+        ranks = [evaluate(board, score) for board, score in zip(boards, scores)]
+        if self.stats is not None:
+            self.stats.heuristic_calls += len(ranks)
+        keep = heapq.nlargest(self.max_frontier, range(len(ranks)), key=ranks.__getitem__)
+        keep.sort()  # Level order decides ties between equal final scores
+        return (
+            array("Q", [boards[i] for i in keep]),
+            array("Q", [scores[i] for i in keep]),
+            array("B", [roots[i] for i in keep]),
+        )
 
-        while queue:
-            board, score, moves = queue.popleft()
+    def bfs(self, max_depth=3, deadline=None):
+        """Perform BFS to find the best move up to a given depth.
 
-            if len(moves) >= max_depth:
-                if score > best_score:
-                    best_score = score
-                    best_moves = moves
-                continue
+        The frontier holds one level at a time in flat arrays: the packed board, the
+        score gained since the root, and the index of the root move it descends from.
+        A board reached more than once on a level is kept once, with its best score,
+        since the moves still to come do not depend on how it was reached. Raises
+        SearchTimeout if the deadline passes before the search finishes.
 
-            for move_func, move_name in [
-                (self.game.move_left, 'left'),
-                (self.game.move_right, 'right'),
-                (self.game.move_up, 'up'),
-                (self.game.move_down, 'down')
-            ]:
-                temp_board = [row[:] for row in self.game.board]
-                temp_score = self.game.score
+        With max_frontier set, every level but the last keeps at most that many states,
+        so the search holds at most four times max_frontier boards for any depth.
+        """
+        stats = self.stats
+        boards = array("Q", [bitboard.pack(self.game.board)])
+        scores = array("Q", [0])
+        roots = array("B", [0])
+        moves = tuple(enumerate(bitboard.MOVES.values()))
 
-                self.game.board = board
-                self.game.score = score
-                move_func()
+        for depth in range(max_depth):
+            next_boards = array("Q")
+            next_scores = array("Q")
+            next_roots = array("B")
+            positions = {}  # Board -> its index in the next level
 
-                if self.game.board != temp_board:
-                    queue.append((self.game.board, self.game.score, moves + [move_name]))
+            for board, score, root in zip(boards, scores, roots):
+                check_deadline(deadline)
+                if stats is not None:
+                    stats.nodes_expanded += 1
+                legal = bitboard.legal_moves(board)
+                for move_index, move in moves:
+                    if not legal & (1 << move_index):
+                        continue
+                    new_board, gained = move(board)
+                    new_score = score + gained
+                    if stats is not None:
+                        stats.generated(new_board)
+                    position = positions.get(new_board)
+                    if position is None:
+                        positions[new_board] = len(next_boards)
+                        next_boards.append(new_board)
+                        next_scores.append(new_score)
+                        next_roots.append(root if depth else move_index)
+                    elif new_score > next_scores[position]:
+                        next_scores[position] = new_score
+                        next_roots[position] = root if depth else move_index
 
-                self.game.board = temp_board
-                self.game.score = temp_score
+            # The last level is left whole: the move is chosen there by score alone
+            last = depth == max_depth - 1
+            if self.max_frontier is not None and len(next_boards) > self.max_frontier and not last:
+                next_boards, next_scores, next_roots = self.beam(next_boards, next_scores, next_roots)
+            boards, scores, roots = next_boards, next_scores, next_roots
+            if stats is not None:
+                stats.frontier(len(boards))
+            if not boards:
+                return None  # No line of moves reaches the full depth
 
-        return best_moves[0] if best_moves else None
+        best_gain = max(scores)
+        if best_gain <= 0:
+            return None
+        return DIRECTIONS[roots[scores.index(best_gain)]]
 
     def get_best_move(self):
         """Return the best move using BFS."""
-        return self.bfs()
+        if self.time_budget is not None:
+            return self.legal_move(self.iterative_deepening(self.bfs, self.time_budget))
+        return self.legal_move(self.bfs())
@@ -0,0 +1,223 @@
+"""
+Bitboard engine for 2048.
+
+The 4x4 grid is packed into a single 64-bit integer: each cell holds the
+exponent of its tile (0 for empty, 1 for 2, 2 for 4, ...) in 4 bits.
+Row i occupies bits 16*i..16*i+15 and column j of that row is the nibble
+at bit 16*i + 4*j, so a row is a 16-bit integer whose lowest nibble is its
+leftmost cell. Tiles are capped at 32768 (exponent 15); two such tiles do
+not merge.
+"""
+
+import random
+
+from game_logic import FOUR_PROBABILITY, MASK_DIRECTIONS, choose, make_rng
+from row_tables import ROW_LEFT, ROW_MOVES, ROW_RIGHT, ROW_SCORE
+
+ROW_MASK = 0xFFFF
+CELL_MASK = 0xF
+
+
+def pack(board):
+    """Pack a list-of-lists board of tile values into a 64-bit integer."""
+    packed = 0
+    shift = 0
+    for row in board:
+        for tile in row:
+            if tile:
+                packed |= (tile.bit_length() - 1) << shift
+            shift += 4
+    return packed
+
+
+def unpack(packed):
+    """Unpack a 64-bit board into a list-of-lists board of tile values."""
+    board = []
+    for i in range(4):
+        row = []
+        for j in range(4):
+            exponent = (packed >> (16 * i + 4 * j)) & CELL_MASK
+            row.append(1 << exponent if exponent else 0)
+        board.append(row)
+    return board
+
+
+def get_row(packed, i):
+    """Return row i of the board as a 16-bit integer."""
+    return (packed >> (16 * i)) & ROW_MASK
+
+
+def transpose(packed):
+    """Swap rows and columns of the board."""
+    a1 = packed & 0xF0F00F0FF0F00F0F
+    a2 = packed & 0x0000F0F00000F0F0
+    a3 = packed & 0x0F0F00000F0F0000
+    a = a1 | (a2 << 12) | (a3 >> 12)
+    b1 = a & 0xFF00FF0000FF00FF
+    b2 = a & 0x00FF00FF00000000
+    b3 = a & 0x00000000FF00FF00
+    return b1 | (b2 >> 24) | (b3 << 24)
+
+
+def _slide_rows(packed, table):
+    """Look up all four rows of the board in a row table."""
+    r0 = packed & ROW_MASK
+    r1 = (packed >> 16) & ROW_MASK
+    r2 = (packed >> 32) & ROW_MASK
+    r3 = (packed >> 48) & ROW_MASK
+    result = table[r0] | (table[r1] << 16) | (table[r2] << 32) | (table[r3] << 48)
+    return result, ROW_SCORE[r0] + ROW_SCORE[r1] + ROW_SCORE[r2] + ROW_SCORE[r3]
+
+
+def move_left(packed):
+    """Move tiles to the left, returning (board, gained)."""
+    return _slide_rows(packed, ROW_LEFT)
+
+
+def move_right(packed):
+    """Move tiles to the right, returning (board, gained)."""
+    return _slide_rows(packed, ROW_RIGHT)
+
+
+def move_up(packed):
+    """Move tiles up, returning (board, gained)."""
+    result, gained = _slide_rows(transpose(packed), ROW_LEFT)
+    return transpose(result), gained
+
+
+def move_down(packed):
+    """Move tiles down, returning (board, gained)."""
+    result, gained = _slide_rows(transpose(packed), ROW_RIGHT)
+    return transpose(result), gained
+
+
+MOVES = {
+    "left": move_left,
+    "right": move_right,
+    "up": move_up,
+    "down": move_down,
+}
+
+# (name, move) pairs for every legal-move mask, so searches only try live directions
+MASK_MOVES = [
+    tuple((direction, MOVES[direction]) for direction in directions)
+    for directions in MASK_DIRECTIONS
+]
+
+
+def legal_moves(packed):
+    """Return a 4-bit mask of the directions that would change the board.
+
+    Bits follow game_logic.MOVE_BITS: left, right, up, down from the lowest bit.
+    """
+    mask = (
+        ROW_MOVES[packed & ROW_MASK]
+        | ROW_MOVES[(packed >> 16) & ROW_MASK]
+        | ROW_MOVES[(packed >> 32) & ROW_MASK]
+        | ROW_MOVES[(packed >> 48) & ROW_MASK]
+    )
+    columns = transpose(packed)
+    return mask | (
+        ROW_MOVES[columns & ROW_MASK]
+        | ROW_MOVES[(columns >> 16) & ROW_MASK]
+        | ROW_MOVES[(columns >> 32) & ROW_MASK]
+        | ROW_MOVES[(columns >> 48) & ROW_MASK]
+    ) << 2
+
+
+def empty_cells(packed):
+    """Return the bit offsets of all empty cells."""
+    return [shift for shift in range(0, 64, 4) if not (packed >> shift) & CELL_MASK]
+
+
+def add_random_tile(packed, rng=random):
+    """Place a new tile on a random empty cell and return the new board."""
+    empty = empty_cells(packed)
+    if empty:
+        exponent = 2 if FOUR_PROBABILITY and rng.random() < FOUR_PROBABILITY else 1
+        packed |= exponent << choose(rng, empty)
+    return packed
+
+
+# Low bit of every nibble
+NIBBLE_LOW_BITS = 0x1111111111111111
+# Nibbles that have a right-hand neighbour in the same row
+HORIZONTAL_PAIRS = 0x0FFF0FFF0FFF0FFF
+# Nibbles that have a neighbour in the row below
+VERTICAL_PAIRS = 0x0000FFFFFFFFFFFF
+
+
+def _zero_nibbles(x):
+    """Return a mask with the low bit set in every nibble of x that is zero."""
+    x |= x >> 1
+    x |= x >> 2
+    return ~x & NIBBLE_LOW_BITS
+
+
+def is_game_over(packed):
+    """Check if there are no valid moves left.
+
+    The board is stuck when it has no empty cell and no two equal neighbours;
+    both tests work on all sixteen nibbles at once.
+    """
+    if _zero_nibbles(packed):
+        return False
+    if _zero_nibbles(packed ^ (packed >> 4)) & HORIZONTAL_PAIRS:
+        return False
+    return not _zero_nibbles(packed ^ (packed >> 16)) & VERTICAL_PAIRS
+
+
+class BitboardGame2048:
+    """2048 game backed by a packed 64-bit board, mirroring Game2048."""
+
+    def __init__(self, seed=None):
+        self.rng = make_rng(seed)
+        self.board = 0
+        self.score = 0
+        self.reset()
+
+    def reset(self):
+        """Reset the board and add two random tiles."""
+        self.board = 0
+        self.add_random_tile()
+        self.add_random_tile()
+
+    def add_random_tile(self):
+        """Add a new tile to a random empty spot."""
+        self.board = add_random_tile(self.board, self.rng)
+
+    def _apply(self, move):
+        """Apply a packed move, updating the score and spawning a tile."""
+        board, gained = move(self.board)
+        if board != self.board:
+            self.board = board
+            self.score += gained
+            self.add_random_tile()
+
+    def move_left(self):
+        """Move tiles to the left."""
+        self._apply(move_left)
+
+    def move_right(self):
+        """Move tiles to the right."""
+        self._apply(move_right)
+
+    def move_up(self):
+        """Move tiles up."""
+        self._apply(move_up)
+
+    def move_down(self):
+        """Move tiles down."""
+        self._apply(move_down)
+
+    def legal_moves(self):
+        """Return a 4-bit mask of the directions that would change the board."""
+        return legal_moves(self.board)
+
+    def is_game_over(self):
+        """Check if there are no valid moves left."""
+        return is_game_over(self.board)
+
+    def to_list(self):
+        """Return the board as a list-of-lists of tile values."""
+        return unpack(self.board)
@@ -1,43 +1,172 @@
-from player import Player
+import bitboard
+from collections import namedtuple
+from game_logic import DIRECTIONS, slide
+from heuristics import score_evaluator
+from player import Player, check_deadline
+
+# What dfs() returns: the value of the best line and the move that starts it (None
+# at the leaves, or when no move is legal).
+SearchResult = namedtuple("SearchResult", ["value", "move"])
+
+def leaf_evaluator(heuristic_choice=None):
+    """Return evaluate(board, score) for DFS leaves.
+
+    Without a heuristic a leaf is worth its score. With one of the A* heuristics,
+    its value weighted by SCORE_WEIGHTS is added, so lines gaining the same score
+    are told apart by the board they leave behind.
+    """
+    if heuristic_choice is None:
+        return lambda board, score: score
+    evaluate = score_evaluator(heuristic_choice)
+    return lambda board, score: evaluate(bitboard.pack(board), score)
 
 class DFSPlayer(Player):
-    def __init__(self, game):
+    def __init__(self, game, heuristic_choice=None, time_budget=None):
         self.game = game
+        self.time_budget = time_budget  # Seconds per move; None searches a fixed depth
+        self.evaluate = leaf_evaluator(heuristic_choice)
 
-    def dfs(self, depth):
-        """Perform DFS to find the best move."""
-        if depth == 0 or self.game.is_game_over():
-            return self.game.score
+    def dfs(self, depth, board=None, score=None, deadline=None):
+        """Perform DFS to find the best move from the given board (the game's board by default).
 
-        max_score = self.game.score
-        best_move = None
+        Returns a SearchResult. A line that runs out of moves before depth is lost and
+        worth -inf. Raises SearchTimeout if the deadline passes before the search finishes.
+        """
+        check_deadline(deadline)
+        if board is None:
+            board, score = self.game.board, self.game.score
 
-        for move_func, move_name in [
-            (self.game.move_left, 'left'),
-            (self.game.move_right, 'right'),
-            (self.game.move_up, 'up'),
-            (self.game.move_down, 'down')
-        ]:
-            # Create a temporary copy of the board and score
-            temp_board = [row[:] for row in self.game.board]
-            temp_score = self.game.score
+        if depth == 0:
+            if self.stats is not None:
+                self.stats.heuristic_calls += 1
+            return SearchResult(self.evaluate(board, score), None)
 
-            # Perform the move
-            move_func()
+        stats = self.stats
+        if stats is not None:
+            stats.nodes_expanded += 1
 
-            # If the move changed the board, recurse into deeper levels
-            if self.game.board != temp_board:
-                score = self.dfs(depth - 1)
-                if isinstance(score, int) and score > max_score:
-                    max_score = score
-                    best_move = move_name
+        best = SearchResult(float("-inf"), None)
+
+        for move_name in DIRECTIONS:
+            new_board, gained, changed = slide(board, move_name)
 
-            # Restore the original board and score
-            self.game.board = temp_board
-            self.game.score = temp_score
+            # If the move changed the board, recurse into deeper levels
+            if changed:
+                if stats is not None:
+                    stats.generated(bitboard.pack(new_board))
+                value = self.dfs(depth - 1, new_board, score + gained, deadline).value
+                if value > best.value or best.move is None:
+                    best = SearchResult(value, move_name)
 
-        return best_move if best_move else max_score
+        return best
 
     def get_best_move(self):
         """Return the best move using DFS."""
-        return self.dfs(3)  # Search depth 6
+        if self.time_budget is not None:
+            return self.legal_move(self.iterative_deepening(
+                lambda depth, deadline: self.dfs(depth, deadline=deadline).move, self.time_budget
+            ))
+        return self.legal_move(self.dfs(3).move)  # Search depth 3
+
+
+def mergeable_mass(board):
+    """Total value of the tiles on a packed board that could still take part in a merge.
+
+    Without spawns, a tile with no equal partner can only merge if the smaller tiles
+    add up to at least its value. Tiles failing that never merge again, and no move
+    gains more than the remaining mass.
+    """
+    counts = [0] * 16
+    for shift in range(0, 64, 4):
+        counts[(board >> shift) & 0xF] += 1
+
+    mass = 0
+    smaller = 0
+    for exponent in range(1, 16):
+        count = counts[exponent]
+        if not count:
+            continue
+        value = 1 << exponent
+        if count > 1 or smaller >= value:
+            mass += count * value
+        smaller += count * value
+    return mass
+
+
+class PrunedDFSPlayer(DFSPlayer):
+    """DFS over packed boards with move ordering and branch-and-bound pruning.
+
+    The value of a board is the most score gainable within the remaining moves.
+    Moves are tried in order of their immediate gain, and a move is skipped
+    when its gain plus mergeable_mass() for every later move cannot beat the
+    best line already found.
+    """
+
+    def __init__(self, game, depth=6, time_budget=None):
+        super().__init__(game, time_budget=time_budget)
+        self.depth = depth
+        self.nodes_expanded = 0  # Counted over the most recent search
+        self.nodes_pruned = 0
+
+    def ordered_moves(self, board):
+        """(gained, new_board, move_name) for every legal move, highest gain first."""
+        children = []
+        for move_name, move in bitboard.MASK_MOVES[bitboard.legal_moves(board)]:
+            new_board, gained = move(board)
+            children.append((gained, new_board, move_name))
+            if self.stats is not None:
+                self.stats.generated(new_board)
+        children.sort(key=lambda child: child[0], reverse=True)
+        return children
+
+    def search(self, board, depth, alpha, deadline=None):
+        """Best gain within depth moves; only values above alpha need to be exact."""
+        check_deadline(deadline)
+        self.nodes_expanded += 1
+        if self.stats is not None:
+            self.stats.nodes_expanded += 1
+        children = self.ordered_moves(board)
+        if not children:
+            return 0
+        if depth == 1:
+            return children[0][0]
+
+        later_bound = (depth - 1) * mergeable_mass(board)
+        best = 0
+        for position, (gained, new_board, _) in enumerate(children):
+            if gained + later_bound <= max(best, alpha):
+                # Later moves gain no more, so their bounds are no better either
+                self.nodes_pruned += len(children) - position
+                break
+            value = gained + self.search(new_board, depth - 1, max(best, alpha) - gained, deadline)
+            if value > best:
+                best = value
+        return best
+
+    def pruned_dfs(self, depth, deadline=None):
+        """Perform pruned DFS to find the best move up to a given depth."""
+        self.nodes_expanded = 0
+        self.nodes_pruned = 0
+        board = bitboard.pack(self.game.board)
+
+        best_move = None
+        best = -1
+        children = self.ordered_moves(board)
+        later_bound = (depth - 1) * mergeable_mass(board)
+        for position, (gained, new_board, move_name) in enumerate(children):
+            if gained + later_bound <= best:
+                self.nodes_pruned += len(children) - position
+                break
+            value = gained
+            if depth > 1:
+                value += self.search(new_board, depth - 1, best - gained, deadline)
+            if value > best:
+                best = value
+                best_move = move_name
+        return best_move
+
+    def get_best_move(self):
+        """Return the best move using pruned DFS."""
+        if self.time_budget is not None:
+            return self.legal_move(self.iterative_deepening(self.pruned_dfs, self.time_budget))
+        return self.legal_move(self.pruned_dfs(self.depth))
@@ -0,0 +1,176 @@
+from functools import lru_cache
+
+import bitboard
+from game_logic import FOUR_PROBABILITY
+from player import Player, check_deadline
+from row_tables import ROW_COUNT
+from transposition import TranspositionTable
+
+# Row heuristic weights: reward empty cells and mergeable neighbours,
+# penalise non-monotonic rows and large tiles scattered across the board.
+LOST_PENALTY = 200000.0
+MONOTONICITY_POWER = 4.0
+MONOTONICITY_WEIGHT = 47.0
+SUM_POWER = 3.5
+SUM_WEIGHT = 11.0
+MERGES_WEIGHT = 700.0
+EMPTY_WEIGHT = 270.0
+
+
+def row_heuristic(row):
+    """Score a single 16-bit packed row."""
+    tiles = [(row >> shift) & 0xF for shift in (0, 4, 8, 12)]
+    tile_sum = sum(tile ** SUM_POWER for tile in tiles)
+    empty = tiles.count(0)
+
+    merges = 0
+    previous = 0
+    counter = 0
+    for tile in tiles:
+        if tile == 0:
+            continue
+        if tile == previous:
+            counter += 1
+        elif counter > 0:
+            merges += 1 + counter
+            counter = 0
+        previous = tile
+    if counter > 0:
+        merges += 1 + counter
+
+    monotonicity_left = 0.0
+    monotonicity_right = 0.0
+    for i in range(3):
+        left = tiles[i] ** MONOTONICITY_POWER
+        right = tiles[i + 1] ** MONOTONICITY_POWER
+        if tiles[i] > tiles[i + 1]:
+            monotonicity_left += left - right
+        else:
+            monotonicity_right += right - left
+
+    return (
+        LOST_PENALTY
+        + EMPTY_WEIGHT * empty
+        + MERGES_WEIGHT * merges
+        - MONOTONICITY_WEIGHT * min(monotonicity_left, monotonicity_right)
+        - SUM_WEIGHT * tile_sum
+    )
+
+
+@lru_cache(maxsize=None)
+def row_heuristic_table():
+    """Return the row heuristic for every 16-bit row, built on first use."""
+    return [row_heuristic(row) for row in range(ROW_COUNT)]
+
+
+class ExpectimaxPlayer(Player):
+    def __init__(self, game, min_depth=2, max_depth=3, probability_cutoff=1e-4, table_size=200000,
+                 time_budget=None):
+        self.game = game
+        self.time_budget = time_budget  # Seconds per move; None picks the depth from the board
+        self.min_depth = min_depth
+        self.max_depth = max_depth
+        self.probability_cutoff = probability_cutoff
+        self.row_heuristic = row_heuristic_table()
+        # Spawned tile exponents with their probabilities; impossible spawns are skipped.
+        self.spawns = [
+            (exponent, probability)
+            for exponent, probability in ((1, 1.0 - FOUR_PROBABILITY), (2, FOUR_PROBABILITY))
+            if probability > 0
+        ]
+        # Chance node values, cleared every move: spawns searched on one turn were
+        # searched a ply too shallow to answer the next turn's lookups.
+        self.table = TranspositionTable(table_size, exact_depth=False)
+
+    def evaluate(self, board):
+        """Heuristic value of a packed board, summed over its rows and columns."""
+        if self.stats is not None:
+            self.stats.heuristic_calls += 1
+        table = self.row_heuristic
+        columns = bitboard.transpose(board)
+        return (
+            table[board & 0xFFFF]
+            + table[(board >> 16) & 0xFFFF]
+            + table[(board >> 32) & 0xFFFF]
+            + table[(board >> 48) & 0xFFFF]
+            + table[columns & 0xFFFF]
+            + table[(columns >> 16) & 0xFFFF]
+            + table[(columns >> 32) & 0xFFFF]
+            + table[(columns >> 48) & 0xFFFF]
+        )
+
+    def search_depth(self, board):
+        """Pick the search depth from the number of distinct tiles on the board."""
+        distinct = len({(board >> shift) & 0xF for shift in range(0, 64, 4)} - {0})
+        return max(self.min_depth, min(self.max_depth, distinct - 2))
+
+    def max_node(self, board, depth, probability, deadline=None):
+        """Value of the best move from a board where the player is to move."""
+        best = 0.0  # A board with no moves left is lost
+        stats = self.stats
+        if stats is not None:
+            stats.nodes_expanded += 1
+        for _, move in bitboard.MASK_MOVES[bitboard.legal_moves(board)]:
+            new_board, _ = move(board)
+            if stats is not None:
+                stats.generated(new_board)
+            best = max(best, self.chance_node(new_board, depth - 1, probability, deadline))
+        return best
+
+    def chance_node(self, board, depth, probability, deadline=None):
+        """Expected value over every tile the game could spawn on a board."""
+        if depth == 0 or probability < self.probability_cutoff:
+            return self.evaluate(board)
+
+        cached = self.table.get(board, depth)
+        if cached is not None:
+            if self.stats is not None:
+                self.stats.cache_hits += 1
+            return cached
+
+        empty = bitboard.empty_cells(board)
+        if not empty:
+            return self.evaluate(board)
+        check_deadline(deadline)
+        if self.stats is not None:
+            self.stats.nodes_expanded += 1
+
+        cell_probability = probability / len(empty)
+        total = 0.0
+        for shift in empty:
+            for exponent, spawn_probability in self.spawns:
+                total += spawn_probability * self.max_node(
+                    board | (exponent << shift), depth, cell_probability * spawn_probability, deadline
+                )
+        value = total / len(empty)
+        self.table.store(board, depth, value)
+        return value
+
+    def expectimax(self, depth=None, deadline=None):
+        """Perform expectimax search to find the best move.
+
+        The depth defaults to search_depth() of the current board. Raises
+        SearchTimeout if the deadline passes before the search finishes.
+        """
+        board = bitboard.pack(self.game.board)
+        if depth is None:
+            depth = self.search_depth(board)
+
+        best_value = -1.0
+        best_move = None
+        for move_name, move in bitboard.MASK_MOVES[bitboard.legal_moves(board)]:
+            new_board, _ = move(board)
+            if self.stats is not None:
+                self.stats.generated(new_board)
+            value = self.chance_node(new_board, depth - 1, 1.0, deadline)
+            if value > best_value:
+                best_value = value
+                best_move = move_name
+        return best_move
+
+    def get_best_move(self):
+        """Return the best move using expectimax."""
+        self.table.clear()
+        if self.time_budget is not None:
+            return self.legal_move(self.iterative_deepening(self.expectimax, self.time_budget))
+        return self.legal_move(self.expectimax())
@@ -1,7 +1,188 @@
 import random
 
+from row_tables import ROW_LEFT, ROW_MOVES, ROW_SCORE
+
+DIRECTIONS = ("left", "right", "up", "down")
+
+# Bit of each direction in a legal-move mask (see legal_moves)
+MOVE_BITS = {direction: 1 << i for i, direction in enumerate(DIRECTIONS)}
+ALL_MOVES = (1 << len(DIRECTIONS)) - 1
+
+# The directions set in each possible mask, in DIRECTIONS order
+MASK_DIRECTIONS = [
+    tuple(direction for direction, bit in MOVE_BITS.items() if mask & bit)
+    for mask in range(ALL_MOVES + 1)
+]
+
+# Chance that a spawned tile is a 4 instead of a 2. The original game uses 0.1;
+# this engine has always spawned 2s only.
+FOUR_PROBABILITY = 0.0
+
+# Tile value -> exponent for every tile the row tables can hold. Lines with a
+# 32768 tile or larger are not in the tables and fall back to merge_tiles().
+TILE_EXPONENTS = {0: 0, **{1 << exponent: exponent for exponent in range(1, 15)}}
+EXPONENT_TILES = [0] + [1 << exponent for exponent in range(1, 16)]
+
+# Cell coordinates of every line, each ordered towards the side tiles slide to.
+LINES = {
+    "left": [[(i, j) for j in range(4)] for i in range(4)],
+    "right": [[(i, j) for j in reversed(range(4))] for i in range(4)],
+    "up": [[(i, j) for i in range(4)] for j in range(4)],
+    "down": [[(i, j) for i in reversed(range(4))] for j in range(4)],
+}
+
+
+def merge_tiles(tiles):
+    """Merge adjacent equal tiles of a compacted line, returning (merged, gained)."""
+    merged = []
+    gained = 0
+    skip = False
+    for i in range(len(tiles)):
+        if skip:
+            skip = False
+            continue
+        if i + 1 < len(tiles) and tiles[i] == tiles[i + 1]:
+            merged.append(tiles[i] * 2)
+            gained += tiles[i] * 2
+            skip = True
+        else:
+            merged.append(tiles[i])
+    return merged, gained
+
+
+def slide_line(line):
+    """Slide and merge a line towards its start, returning (new_line, gained).
+
+    new_line is None when the line does not change.
+    """
+    exponents = TILE_EXPONENTS
+    try:
+        key = (
+            exponents[line[0]]
+            | exponents[line[1]] << 4
+            | exponents[line[2]] << 8
+            | exponents[line[3]] << 12
+        )
+    except KeyError:
+        merged, gained = merge_tiles([tile for tile in line if tile != 0])
+        merged += [0] * (4 - len(merged))
+        return (merged, gained) if merged != line else (None, 0)
+
+    result = ROW_LEFT[key]
+    if result == key:
+        return None, 0
+    tiles = EXPONENT_TILES
+    merged = [
+        tiles[result & 0xF],
+        tiles[(result >> 4) & 0xF],
+        tiles[(result >> 8) & 0xF],
+        tiles[result >> 12],
+    ]
+    return merged, ROW_SCORE[key]
+
+
+def slide(board, direction):
+    """Slide a board without spawning a tile, returning (new_board, gained, changed).
+
+    The input board is never modified.
+    """
+    new_board = [row[:] for row in board]
+    gained = 0
+    changed = False
+    for line in LINES[direction]:
+        merged, line_gained = slide_line([board[i][j] for i, j in line])
+        if merged is not None:
+            changed = True
+            gained += line_gained
+            for (i, j), tile in zip(line, merged):
+                new_board[i][j] = tile
+    return new_board, gained, changed
+
+
+def make_rng(seed=None):
+    """Return a random source for tile spawns.
+
+    None or an int seeds a new random.Random; random.Random and NumPy Generator
+    instances are used as they are.
+    """
+    if seed is None or isinstance(seed, int):
+        return random.Random(seed)
+    return seed
+
+
+def choose(rng, items):
+    """Pick a random item using either a random.Random-like or a NumPy Generator source."""
+    if hasattr(rng, "integers"):  # NumPy Generator
+        return items[int(rng.integers(len(items)))]
+    return rng.choice(items)
+
+
+def draw_seed(rng):
+    """Draw an int seed for another random source from rng, so it follows rng's seed."""
+    if hasattr(rng, "integers"):  # NumPy Generator
+        return int(rng.integers(1 << 32))
+    return rng.getrandbits(32)
+
+
+def spawn(board, rng=random):
+    """Return a copy of the board with a new tile added to a random empty spot."""
+    new_board = [row[:] for row in board]
+    empty_tiles = [(i, j) for i in range(4) for j in range(4) if board[i][j] == 0]
+    if empty_tiles:
+        i, j = choose(rng, empty_tiles)
+        new_board[i][j] = 4 if FOUR_PROBABILITY and rng.random() < FOUR_PROBABILITY else 2
+    return new_board
+
+
+def legal_moves(board):
+    """Return a 4-bit mask of the directions that would change the board (see MOVE_BITS).
+
+    Each row and column is looked up in the row tables; the board is not modified.
+    """
+    exponents = TILE_EXPONENTS
+    mask = 0
+    try:
+        for row in board:
+            mask |= ROW_MOVES[
+                exponents[row[0]] | exponents[row[1]] << 4 | exponents[row[2]] << 8 | exponents[row[3]] << 12
+            ]
+        for j in range(4):
+            mask |= ROW_MOVES[
+                exponents[board[0][j]]
+                | exponents[board[1][j]] << 4
+                | exponents[board[2][j]] << 8
+                | exponents[board[3][j]] << 12
+            ] << 2
+            if mask == ALL_MOVES:
+                break
+    except KeyError:  # A tile too large for the tables
+        mask = 0
+        for direction, bit in MOVE_BITS.items():
+            if slide(board, direction)[2]:
+                mask |= bit
+    return mask
+
+
+def is_game_over(board):
+    """Check if no move can change the board: no empty cell and no equal neighbours."""
+    for i in range(4):
+        row = board[i]
+        below = board[i + 1] if i < 3 else None
+        for j in range(4):
+            tile = row[j]
+            if tile == 0:
+                return False
+            if j < 3 and tile == row[j + 1]:
+                return False
+            if below is not None and tile == below[j]:
+                return False
+    return True
+
+
 class Game2048:
-    def __init__(self):
+    def __init__(self, seed=None):
+        """Create a game; seed is an int, a random.Random or a NumPy Generator (see make_rng)."""
+        self.rng = make_rng(seed)
         self.board = [[0] * 4 for _ in range(4)]
         self.score = 0
         self.reset()
@@ -13,37 +194,25 @@ class Game2048:
         self.add_random_tile()
 
     def add_random_tile(self):
-        """Add a new tile with value 2 or 4 to a random empty spot."""
-        empty_tiles = [(i, j) for i in range(4) for j in range(4) if self.board[i][j] == 0]
-        if empty_tiles:
-            i, j = random.choice(empty_tiles)
-            self.board[i][j] = 2
+        """Add a new tile to a random empty spot."""
+        self.board = spawn(self.board, self.rng)
 
-    def move_left(self):
-        """Move tiles to the left."""
-        changed = False
-        for row in self.board:
-            merged = self.merge([tile for tile in row if tile != 0])
-            if merged != row:
-                changed = True
-            row[:] = merged + [0] * (4 - len(merged))
+    def move(self, direction):
+        """Slide the board towards the given side and add a tile if anything moved."""
+        board, gained, changed = slide(self.board, direction)
         if changed:
+            self.board = board
+            self.score += gained
             self.add_random_tile()
 
+    def move_left(self):
+        """Move tiles to the left."""
+        self.move("left")
+
     def merge(self, row):
         """Merge row tiles if adjacent values are the same."""
-        merged = []
-        skip = False
-        for i in range(len(row)):
-            if skip:
-                skip = False
-                continue
-            if i + 1 < len(row) and row[i] == row[i + 1]:
-                merged.append(row[i] * 2)
-                self.score += row[i] * 2
-                skip = True
-            else:
-                merged.append(row[i])
+        merged, gained = merge_tiles(row)
+        self.score += gained
         return merged
 
     def rotate_clockwise(self):
@@ -52,41 +221,20 @@ class Game2048:
 
     def move_right(self):
         """Move tiles to the right."""
-        self.rotate_clockwise()
-        self.rotate_clockwise()
-        self.move_left()
-        self.rotate_clockwise()
-        self.rotate_clockwise()
+        self.move("right")
 
     def move_up(self):
         """Move tiles up."""
-        self.rotate_clockwise()
-        self.rotate_clockwise()
-        self.rotate_clockwise()
-        self.move_left()
-        self.rotate_clockwise()
+        self.move("up")
 
     def move_down(self):
         """Move tiles down."""
-        self.rotate_clockwise()
-        self.move_left()
-        self.rotate_clockwise()
-        self.rotate_clockwise()
-        self.rotate_clockwise()
+        self.move("down")
+
+    def legal_moves(self):
+        """Return a 4-bit mask of the directions that would change the board."""
+        return legal_moves(self.board)
 
     def is_game_over(self):
         """Check if there are no valid moves left."""
-        # Create a temporary copy of the board and score
-        temp_board = [row[:] for row in self.board]
-        temp_score = self.score
-
-        # Check if any move changes the board state
-        for move in [self.move_left, self.move_right, self.move_up, self.move_down]:
-            self.board = [row[:] for row in temp_board]  # Reset the board
-            self.score = temp_score  # Reset the score
-            move()
-            if self.board != temp_board:  # If the board changed, the game is not over
-                return False
-
-        # If no move changes the board, the game is over
-        return True
+        return is_game_over(self.board)
@@ -0,0 +1,156 @@
+"""
+Table-driven board heuristics for packed boards.
+
+Each heuristic is a combination (sum or max) of per-line terms: one term per
+row and, where the heuristic looks across rows, one per column. Line terms
+are precomputed for all 65,536 packed lines the first time a heuristic is
+used, so evaluating a board costs at most eight lookups. After a move only
+the lines that changed need new lookups (see LineHeuristic.update).
+"""
+
+from functools import lru_cache
+
+import bitboard
+from row_tables import ROW_COUNT
+
+HORIZONTAL = ("left", "right")
+
+
+def line_tiles(line):
+    """Tile values of a 16-bit packed line, first cell first."""
+    tiles = []
+    for shift in (0, 4, 8, 12):
+        exponent = (line >> shift) & 0xF
+        tiles.append(1 << exponent if exponent else 0)
+    return tiles
+
+
+def empty_term(tiles):
+    """Number of empty cells in a line."""
+    return tiles.count(0)
+
+
+def max_term(tiles):
+    """Largest tile in a line."""
+    return max(tiles)
+
+
+def monotonicity_term(tiles):
+    """Number of neighbouring pairs that decrease along a line."""
+    return sum(1 for i in range(3) if tiles[i] > tiles[i + 1])
+
+
+def clustering_term(tiles):
+    """Differences between neighbouring tiles, counted once for each non-empty tile of the pair."""
+    penalty = 0
+    for i in range(3):
+        a, b = tiles[i], tiles[i + 1]
+        penalty += abs(a - b) * ((a > 0) + (b > 0))
+    return penalty
+
+
+@lru_cache(maxsize=None)
+def line_table(term):
+    """Return the term's value for every 16-bit packed line, built on first use."""
+    return [term(line_tiles(line)) for line in range(ROW_COUNT)]
+
+
+def _lines(board):
+    """Split a packed board into its four 16-bit rows."""
+    return (board & 0xFFFF, (board >> 16) & 0xFFFF, (board >> 32) & 0xFFFF, (board >> 48) & 0xFFFF)
+
+
+class LineHeuristic:
+    """Board heuristic combined from per-row and optional per-column line terms.
+
+    A board's terms are a tuple of four row terms followed by four column
+    terms (zero when the heuristic only looks at rows).
+    """
+
+    def __init__(self, row_term, column_term=None, combine=sum):
+        self.row_term = row_term
+        self.column_term = column_term
+        self.combine = combine
+
+    @property
+    def row_table(self):
+        return line_table(self.row_term)
+
+    @property
+    def column_table(self):
+        return line_table(self.column_term) if self.column_term else None
+
+    def terms(self, board):
+        """Look up every line term of a packed board."""
+        rows = self.row_table
+        row_terms = tuple(rows[line] for line in _lines(board))
+        columns = self.column_table
+        if columns is None:
+            return row_terms + (0, 0, 0, 0)
+        return row_terms + tuple(columns[line] for line in _lines(bitboard.transpose(board)))
+
+    def update(self, terms, board, new_board, direction):
+        """Terms of new_board, reached from board by a move in the given direction.
+
+        Only the lines along the move can change without every line across it
+        changing too, so those are looked up only where they differ.
+        """
+        rows = self.row_table
+        columns = self.column_table
+        if direction in HORIZONTAL:
+            old_rows = _lines(board)
+            new_rows = _lines(new_board)
+            row_terms = tuple(
+                terms[i] if new_rows[i] == old_rows[i] else rows[new_rows[i]] for i in range(4)
+            )
+            if columns is None:
+                return row_terms + (0, 0, 0, 0)
+            return row_terms + tuple(columns[line] for line in _lines(bitboard.transpose(new_board)))
+
+        row_terms = tuple(rows[line] for line in _lines(new_board))
+        if columns is None:
+            return row_terms + (0, 0, 0, 0)
+        old_columns = _lines(bitboard.transpose(board))
+        new_columns = _lines(bitboard.transpose(new_board))
+        return row_terms + tuple(
+            terms[4 + i] if new_columns[i] == old_columns[i] else columns[new_columns[i]]
+            for i in range(4)
+        )
+
+    def value(self, terms):
+        """Combine a board's line terms into its heuristic value."""
+        return self.combine(terms)
+
+    def __call__(self, board):
+        """Heuristic value of a packed board."""
+        return self.combine(self.terms(board))
+
+
+HEURISTICS = {
+    "empty_tiles": LineHeuristic(empty_term),
+    "max_tile": LineHeuristic(max_term, combine=max),
+    "monotonicity": LineHeuristic(monotonicity_term),
+    "clustering": LineHeuristic(clustering_term, clustering_term),
+}
+
+# Points of game score that one unit of each heuristic is worth, for searches that
+# add a heuristic to the score (see DFSPlayer). Negative where lower is better.
+SCORE_WEIGHTS = {
+    "empty_tiles": 8,
+    "max_tile": 1,
+    "monotonicity": -4,
+    "clustering": -0.01,
+}
+
+
+def score_evaluator(heuristic_choice=None):
+    """Return evaluate(board, score) for a packed board: the score plus the weighted heuristic.
+
+    Without a heuristic a board is worth its score alone.
+    """
+    if heuristic_choice is None:
+        return lambda board, score: score
+    heuristic = HEURISTICS[heuristic_choice]
+    weight = SCORE_WEIGHTS[heuristic_choice]
+    heuristic.terms(0)  # Build the line tables now rather than during the first search
+    return lambda board, score: score + weight * heuristic(board)
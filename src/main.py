@@ -1,41 +1,19 @@
-import pygame
 import sys
 from game_logic import Game2048
 from bfs_ai import BFSPlayer
-from dfs_ai import DFSPlayer
+from dfs_ai import DFSPlayer, PrunedDFSPlayer
 from astar_ai import AStarPlayer  # Import AStarPlayer
-
-pygame.init()
-
-# Constants
-WIDTH, HEIGHT = 400, 400
-TILE_SIZE = WIDTH // 4
-FONT = pygame.font.Font(None, 40)
-
-def draw_board(screen, game):
-    """Draw the 2048 game board with grid lines."""
-    screen.fill((187, 173, 160))  # Background color
-
-    # Draw the tiles
-    for i in range(4):
-        for j in range(4):
-            tile = game.board[i][j]
-            rect = pygame.Rect(j * TILE_SIZE, i * TILE_SIZE, TILE_SIZE, TILE_SIZE)
-            pygame.draw.rect(screen, (205, 193, 180) if tile == 0 else (238, 228, 218), rect)
-            if tile != 0:
-                text = FONT.render(str(tile), True, (119, 110, 101))
-                screen.blit(text, text.get_rect(center=rect.center))
-
-    # Draw the grid lines
-    line_color = (119, 110, 101)  # Grey color for the grid lines
-    for i in range(1, 4):
-        pygame.draw.line(screen, line_color, (0, i * TILE_SIZE), (WIDTH, i * TILE_SIZE), 2)
-        pygame.draw.line(screen, line_color, (i * TILE_SIZE, 0), (i * TILE_SIZE, HEIGHT), 2)
-
-    pygame.display.flip()
+from expectimax_ai import ExpectimaxPlayer
+from mcts_ai import MCTSPlayer
+from rollout_ai import RolloutPlayer
+from ntuple_ai import NTuplePlayer
 
 def run_game(player_type):
     """Helper function to run the game with the specified player strategy."""
+    # Loaded here so that importing main (e.g. for select_player) never needs pygame
+    import pygame
+    from renderer import HEIGHT, WIDTH, draw_board
+
     game = Game2048()
     player = player_type(game)  # Inject strategy dynamically
 
@@ -44,9 +22,7 @@ def run_game(player_type):
 
     clock = pygame.time.Clock()
 
-    valid_moves = {"left", "right", "up", "down"}  # Set of valid move names
-
-    while True:
+    while not game.is_game_over():
         draw_board(screen, game)
 
         for event in pygame.event.get():
@@ -54,46 +30,63 @@ def run_game(player_type):
                 pygame.quit()
                 sys.exit()
 
-        # AI makes a move
+        # AI makes a move; players only return None once no move is left
         best_move = player.get_best_move()
-        if best_move in valid_moves:  # Ensure the move is valid
-            getattr(game, f"move_{best_move}")()  # Execute the valid move
-        else:
-            print(f"Invalid move detected: {best_move}")  # Debugging print
-
-        # Check for game over
-        if game.is_game_over():
-            print(f"Game Over! Final Score: {game.score}")
-            pygame.quit()
-            sys.exit()  # Ensure the program exits after printing the score
+        if best_move is None:
+            break
+        game.move(best_move)
 
         clock.tick(1)  # Control the speed of AI moves
 
+    draw_board(screen, game)
+    print(f"Game Over! Final Score: {game.score}")
+
+    # Keep the final board on screen, sleeping until the window is closed
+    while pygame.event.wait().type != pygame.QUIT:
+        pass
+    pygame.quit()
+    sys.exit()
+
 
 def select_player():
     """Prompt the user to select a player strategy and heuristic."""
     while True:
-        choice = input("Select AI strategy (bfs/dfs/astar): ").strip().lower()
+        choice = input("Select AI strategy (bfs/dfs/pruned-dfs/astar/expectimax/mcts/rollout/ntuple): ").strip().lower()
         if choice == "bfs":
             return BFSPlayer
         elif choice == "dfs":
-            return DFSPlayer
+            heuristic = select_heuristic("DFS leaf", allow_none=True)
+            return lambda game: DFSPlayer(game, heuristic_choice=heuristic)
+        elif choice == "pruned-dfs":
+            return PrunedDFSPlayer
         elif choice == "astar":
-            heuristic = select_astar_heuristic()
+            heuristic = select_heuristic("A*")
             return lambda game: AStarPlayer(game, heuristic_choice=heuristic)
+        elif choice == "expectimax":
+            return ExpectimaxPlayer
+        elif choice == "mcts":
+            return MCTSPlayer
+        elif choice == "rollout":
+            return RolloutPlayer
+        elif choice == "ntuple":
+            return NTuplePlayer
         else:
-            print("Invalid choice. Please enter 'bfs', 'dfs', or 'astar'.")
+            print("Invalid choice. Please enter 'bfs', 'dfs', 'pruned-dfs', 'astar', 'expectimax', 'mcts', 'rollout', or 'ntuple'.")
 
-def select_astar_heuristic():
-    """Prompt the user to select a heuristic for A* strategy."""
+def select_heuristic(label, allow_none=False):
+    """Prompt the user to select a heuristic, or none at all if allow_none is set."""
     while True:
-        print("Select A* heuristic:")
+        print(f"Select {label} heuristic:")
+        if allow_none:
+            print("0. None (score only)")
         print("1. Empty Tiles")
         print("2. Max Tile")
         print("3. Monotonicity")
         print("4. Clustering")
         choice = input("Enter the number of your choice: ").strip()
-        if choice == "1":
+        if choice == "0" and allow_none:
+            return None
+        elif choice == "1":
             return "empty_tiles"
         elif choice == "2":
             return "max_tile"
@@ -102,7 +95,7 @@ def select_astar_heuristic():
         elif choice == "4":
             return "clustering"
         else:
-            print("Invalid choice. Please enter 1, 2, 3, or 4.")
+            print(f"Invalid choice. Please enter {'0, ' if allow_none else ''}1, 2, 3, or 4.")
 
 if __name__ == "__main__":
     # Get user input to select the strategy and run the game
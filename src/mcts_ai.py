@@ -0,0 +1,185 @@
+import math
+import time
+
+import bitboard
+from game_logic import choose, draw_seed, make_rng
+from player import Player
+
+
+class MCTSNode:
+    """Statistics of an afterstate: a board after a move, before its tile spawns.
+
+    Afterstates are keyed by their packed board, so every move order that reaches
+    the same board shares one node. total sums the score gained after the node on
+    every pass through it; the gain of the move into it is added by the parent.
+    """
+
+    __slots__ = ("visits", "total")
+
+    def __init__(self):
+        self.visits = 0
+        self.total = 0
+
+
+def random_rollout(board, rng):
+    """A uniformly random legal move: (gained, new_board), or None if the game is over."""
+    legal = bitboard.legal_moves(board)
+    if not legal:
+        return None
+    _, move = choose(rng, bitboard.MASK_MOVES[legal])
+    new_board, gained = move(board)
+    return gained, new_board
+
+
+def greedy_rollout(board, rng):
+    """The legal move gaining the most score, random among equals, or None if the game is over."""
+    legal = bitboard.legal_moves(board)
+    if not legal:
+        return None
+    children = [move(board) for _, move in bitboard.MASK_MOVES[legal]]
+    best = max(gained for _, gained in children)
+    new_board, gained = choose(rng, [child for child in children if child[1] == best])
+    return gained, new_board
+
+
+ROLLOUTS = {
+    "random": random_rollout,
+    "greedy": greedy_rollout,
+}
+
+
+class MCTSPlayer(Player):
+    """Monte Carlo tree search with UCT selection over shared afterstate nodes.
+
+    Each iteration walks down from the current board, picking moves by UCT and
+    sampling tile spawns, until it reaches an afterstate with no node yet. That
+    node is added and valued by a rollout of at most rollout_depth moves. The
+    score gained along the way is then backed up through every node visited.
+    The move finally played is the root move with the most visits.
+    """
+
+    def __init__(self, game, iterations=200, rollout="greedy", rollout_depth=20, exploration=0.5,
+                 max_nodes=1000000, seed=None, time_budget=None):
+        self.game = game
+        self.iterations = iterations
+        self.time_budget = time_budget  # Seconds per move; None runs a fixed number of iterations
+        self.rollout_policy = ROLLOUTS[rollout]
+        self.rollout_depth = rollout_depth
+        self.exploration = exploration
+        self.max_nodes = max_nodes
+        # Without a seed, one is drawn from the game's rng, so seeded games replay exactly
+        self.rng = make_rng(draw_seed(game.rng) if seed is None else seed)
+        # Afterstate nodes, kept across moves until there are more than max_nodes
+        self.nodes = {}
+        self.scale = 1  # Largest return seen, to bring UCT values into [0, 1]
+
+    def rollout(self, board):
+        """Score gained by the rollout policy from a board within rollout_depth moves."""
+        rng = self.rng
+        policy = self.rollout_policy
+        total = 0
+        for _ in range(self.rollout_depth):
+            result = policy(board, rng)
+            if result is None:
+                break
+            gained, board = result
+            total += gained
+            board = bitboard.add_random_tile(board, rng)
+        return total
+
+    def select(self, children, visits):
+        """The (node, afterstate, gained) child with the highest UCT value."""
+        scale = self.scale
+        exploration = self.exploration * math.sqrt(math.log(visits))
+        return max(
+            children,
+            key=lambda child: (child[2] + child[0].total / child[0].visits) / scale
+            + exploration / math.sqrt(child[0].visits),
+        )
+
+    def iterate(self, board):
+        """Run one selection, expansion, rollout and backup pass from a board."""
+        nodes = self.nodes
+        rng = self.rng
+        stats = self.stats
+        path = []  # (node, score gained from the root up to and including its move)
+        gained = 0
+        future = 0
+        while True:
+            legal = bitboard.legal_moves(board)
+            if not legal:
+                break
+            children = []
+            unvisited = []
+            for _, move in bitboard.MASK_MOVES[legal]:
+                after, gain = move(board)
+                node = nodes.get(after)
+                if node is None:
+                    unvisited.append((after, gain))
+                else:
+                    children.append((node, after, gain))
+
+            if unvisited:
+                after, gain = choose(rng, unvisited)
+                node = nodes[after] = MCTSNode()
+                if stats is not None:
+                    stats.nodes_expanded += 1
+                    stats.generated(after)
+                gained += gain
+                path.append((node, gained))
+                future = self.rollout(bitboard.add_random_tile(after, rng))
+                break
+
+            node, after, gain = self.select(children, sum(child[0].visits for child in children))
+            gained += gain
+            path.append((node, gained))
+            board = bitboard.add_random_tile(after, rng)
+
+        total = gained + future
+        if total > self.scale:
+            self.scale = total
+        for node, gained_at in path:
+            node.visits += 1
+            node.total += total - gained_at
+
+    def mcts(self, iterations=None, deadline=None):
+        """Run MCTS from the game's board and return the most visited move.
+
+        Stops after the given number of iterations or, with a deadline, once it has
+        passed, though never before running one iteration per possible move.
+        """
+        board = bitboard.pack(self.game.board)
+        legal = bitboard.legal_moves(board)
+        if not legal:
+            return None
+        if len(self.nodes) > self.max_nodes:
+            self.nodes.clear()
+
+        if deadline is None:
+            for _ in range(iterations or self.iterations):
+                self.iterate(board)
+        else:
+            count = 0
+            while count < 4 or time.perf_counter() < deadline:
+                self.iterate(board)
+                count += 1
+        if self.stats is not None:
+            self.stats.frontier(len(self.nodes))
+
+        best_move = None
+        best = (-1, 0.0)
+        for move_name, move in bitboard.MASK_MOVES[legal]:
+            after, gained = move(board)
+            node = self.nodes.get(after)
+            if node is not None and node.visits:
+                rank = (node.visits, gained + node.total / node.visits)
+                if rank > best:
+                    best = rank
+                    best_move = move_name
+        return best_move
+
+    def get_best_move(self):
+        """Return the best move using MCTS."""
+        if self.time_budget is not None:
+            return self.legal_move(self.mcts(deadline=time.perf_counter() + self.time_budget))
+        return self.legal_move(self.mcts())
@@ -0,0 +1,211 @@
+"""
+N-tuple network value function for packed boards, trained by TD(0) self-play.
+
+A pattern is a tuple of cells; the tile exponents found in those cells index
+a lookup table of 16 ** len(pattern) weights. Every pattern is applied in all
+eight symmetries of the board, and a board's value is the sum of the weights
+it selects. All tables live in one flat float32 array, saved and loaded as a
+.npy file, so evaluating a board costs one gather and a sum.
+
+The network learns afterstate values (the board after a move, before its
+spawn) from self-play: each move is chosen greedily by gained score plus
+value, and the previous afterstate's value is moved towards that target.
+Games run in parallel worker processes; after every round the workers' weight
+changes are averaged into the shared network:
+
+    python3 ntuple.py --games 2000 --workers 4 --output ntuple_weights.npy
+"""
+
+import argparse
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import bitboard
+
+# Cells are numbered row by row, 4 * row + column, like the nibbles of a packed board
+PATTERNS = (
+    (0, 1, 2, 3),  # Outer row
+    (4, 5, 6, 7),  # Inner row
+    (0, 1, 4, 5),  # Corner square
+    (1, 2, 5, 6),  # Edge square
+    (5, 6, 9, 10),  # Centre square
+)
+
+WEIGHTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ntuple_weights.npy")
+
+CELL_SHIFTS = np.arange(0, 64, 4, dtype=np.uint64)
+
+
+def symmetries(cells):
+    """The cells under each of the eight rotations and reflections of the board."""
+    variants = []
+    for transpose in (False, True):
+        for flip_rows in (False, True):
+            for flip_columns in (False, True):
+                variant = []
+                for cell in cells:
+                    row, column = divmod(cell, 4)
+                    if transpose:
+                        row, column = column, row
+                    if flip_rows:
+                        row = 3 - row
+                    if flip_columns:
+                        column = 3 - column
+                    variant.append(4 * row + column)
+                variants.append(tuple(variant))
+    return variants
+
+
+class NTupleNetwork:
+    """Sum of pattern lookup tables over every symmetry of a packed board."""
+
+    def __init__(self, patterns=PATTERNS, weights=None):
+        self.patterns = patterns
+        sizes = [16 ** len(pattern) for pattern in patterns]
+        offsets = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+        if weights is None:
+            weights = np.zeros(sum(sizes), dtype=np.float32)
+        elif len(weights) != sum(sizes):
+            raise ValueError(f"expected {sum(sizes)} weights for these patterns, got {len(weights)}")
+        self.weights = weights
+
+        # One feature per pattern and symmetry. Patterns of different lengths are
+        # padded with cell 0 and a place value of 0, so the padding adds nothing.
+        length = max(len(pattern) for pattern in patterns)
+        cells = []
+        places = []
+        feature_offsets = []
+        for pattern, offset in zip(patterns, offsets):
+            for variant in symmetries(pattern):
+                cells.append(variant + (0,) * (length - len(variant)))
+                places.append([16 ** k for k in range(len(variant))] + [0] * (length - len(variant)))
+                feature_offsets.append(offset)
+        self.cells = np.array(cells, dtype=np.intp)
+        self.places = np.array(places, dtype=np.int64)
+        self.offsets = np.array(feature_offsets, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.weights)
+
+    def indices(self, board):
+        """Weight indices selected by a packed board, one per pattern and symmetry."""
+        exponents = ((np.uint64(board) >> CELL_SHIFTS) & np.uint64(0xF)).astype(np.int64)
+        return self.offsets + (exponents[self.cells] * self.places).sum(axis=1)
+
+    def __call__(self, board):
+        """Value of a packed board."""
+        return float(self.weights[self.indices(board)].sum())
+
+    def update(self, board, error, learning_rate):
+        """Move the board's value by learning_rate * error, shared across its weights."""
+        indices = self.indices(board)
+        np.add.at(self.weights, indices, np.float32(learning_rate * error / len(indices)))
+
+    def best_move(self, board):
+        """(value, afterstate, gained, move name) of the move maximising gain plus value, or None."""
+        best = None
+        for move_name, move in bitboard.MASK_MOVES[bitboard.legal_moves(board)]:
+            after, gained = move(board)
+            value = gained + self(after)
+            if best is None or value > best[0]:
+                best = (value, after, gained, move_name)
+        return best
+
+    def save(self, path=WEIGHTS_PATH):
+        """Write the weights to a .npy file."""
+        np.save(path, self.weights)
+
+
+def load(path=WEIGHTS_PATH, patterns=PATTERNS):
+    """Load a network saved with NTupleNetwork.save; the patterns must match the saved ones."""
+    return NTupleNetwork(patterns, np.load(path).astype(np.float32, copy=False))
+
+
+def play_training_game(network, rng, learning_rate):
+    """Play one greedy game, updating afterstate values by TD(0). Returns the final score."""
+    board = bitboard.add_random_tile(bitboard.add_random_tile(0, rng), rng)
+    previous = None
+    score = 0
+    while True:
+        best = network.best_move(board)
+        if best is None:
+            break
+        value, after, gained, _ = best
+        if previous is not None:
+            network.update(previous, value - network(previous), learning_rate)
+        previous = after
+        score += gained
+        board = bitboard.add_random_tile(after, rng)
+    if previous is not None:
+        network.update(previous, -network(previous), learning_rate)  # Nothing follows a lost game
+    return score
+
+
+def self_play(weights, patterns, games, seed, learning_rate):
+    """Train a copy of the weights on some games; return (weight change, scores)."""
+    network = NTupleNetwork(patterns, weights.copy())
+    rng = random.Random(seed)
+    scores = [play_training_game(network, rng, learning_rate) for _ in range(games)]
+    return network.weights - weights, scores
+
+
+def train(network, games, workers=1, round_games=50, learning_rate=0.1, seed=0):
+    """Train a network by self-play, merging the workers' weight changes after every round.
+
+    Each round, every worker plays round_games games from the round's weights.
+    Their weight changes are averaged into the network. The last round is cut down
+    to the games still to play, split across the workers, so exactly games games are
+    played. Returns the scores of every game, in round and worker order.
+    """
+    scores = []
+    rounds = -(-games // (workers * round_games))
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        for round_index in range(rounds):
+            remaining = min(games - len(scores), workers * round_games)
+            counts = [remaining // workers + (worker < remaining % workers) for worker in range(workers)]
+            jobs = [
+                (network.weights, network.patterns, count, seed + round_index * workers + worker, learning_rate)
+                for worker, count in enumerate(counts)
+                if count
+            ]
+            if executor is not None:
+                results = list(executor.map(self_play, *zip(*jobs)))
+            else:
+                results = [self_play(*job) for job in jobs]
+
+            network.weights += np.mean([delta for delta, _ in results], axis=0, dtype=np.float32)
+            round_scores = [score for _, worker_scores in results for score in worker_scores]
+            scores.extend(round_scores)
+            print(
+                f"Round {round_index + 1}/{rounds} - games {len(scores)} - "
+                f"mean score {sum(round_scores) / len(round_scores):.1f} - max {max(round_scores)}"
+            )
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return scores
+
+
+def parse_args(argv=None):
+    """Parse the trainer's command-line options."""
+    parser = argparse.ArgumentParser(description="Train the n-tuple network by TD(0) self-play.")
+    parser.add_argument("--games", type=int, default=1000, help="self-play games to train on, in rounds of workers * round-games")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes to play games on")
+    parser.add_argument("--round-games", type=int, default=50, help="games per worker between weight merges")
+    parser.add_argument("--learning-rate", type=float, default=0.1, help="TD(0) step size")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first worker's first round")
+    parser.add_argument("--output", default=WEIGHTS_PATH, help="where to save the trained weights")
+    parser.add_argument("--resume", action="store_true", help="continue from the weights in --output")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    network = load(args.output) if args.resume else NTupleNetwork()
+    train(network, args.games, args.workers, args.round_games, args.learning_rate, args.seed)
+    network.save(args.output)
+    print(f"Saved {len(network)} weights to {args.output}")
@@ -0,0 +1,29 @@
+import os
+
+import bitboard
+import ntuple
+from player import Player
+
+class NTuplePlayer(Player):
+    """Plays the move with the best gained score plus n-tuple afterstate value.
+
+    Weights come from ntuple.py training. Without a weights file the network is
+    all zeros, and the player just takes the move that gains the most.
+    """
+
+    def __init__(self, game, weights_path=ntuple.WEIGHTS_PATH, time_budget=None):
+        self.game = game
+        self.time_budget = time_budget  # Unused: a move is a single ply of table lookups
+        if os.path.exists(weights_path):
+            self.network = ntuple.load(weights_path)
+        else:
+            self.network = ntuple.NTupleNetwork()
+
+    def get_best_move(self):
+        """Return the best move by n-tuple value."""
+        board = bitboard.pack(self.game.board)
+        best = self.network.best_move(board)
+        if self.stats is not None:
+            self.stats.nodes_expanded += 1
+            self.stats.heuristic_calls += len(bitboard.MASK_MOVES[bitboard.legal_moves(board)])
+        return self.legal_move(best[3] if best is not None else None)
@@ -1,9 +1,67 @@
 from abc import ABC, abstractmethod
+import time
+
+from game_logic import DIRECTIONS, MOVE_BITS
+
+class SearchTimeout(Exception):
+    """Raised inside a search when its time budget has run out."""
+
+def check_deadline(deadline):
+    """Raise SearchTimeout if a deadline (a time.perf_counter() value) has passed."""
+    if deadline is not None and time.perf_counter() > deadline:
+        raise SearchTimeout
 
 class Player(ABC):
     """Abstract Player class to define a common interface."""
 
+    # Iterative deepening stops here even if time is left, e.g. on a nearly full board
+    MAX_ITERATIVE_DEPTH = 12
+
+    # Optional stats.SearchStats that searches report their work to
+    stats = None
+
+    # Tried in order when a search finds no move worth making. Down and left first
+    # keeps the large tiles in the bottom-left corner.
+    FALLBACK_ORDER = ("down", "left", "right", "up")
+
     @abstractmethod
     def get_best_move(self):
-        """Get the best move for the current game state."""
+        """Get the best move for the current game state.
+
+        Always a legal move while one exists (see legal_move), and None once the game is over.
+        """
         pass
+
+    def fallback_move(self):
+        """The first legal move in FALLBACK_ORDER, or None if the game is over."""
+        legal = self.game.legal_moves()
+        for move in self.FALLBACK_ORDER:
+            if legal & MOVE_BITS[move]:
+                return move
+        return None
+
+    def legal_move(self, move):
+        """Return move if it is legal on the game's board, else fallback_move()."""
+        if move in MOVE_BITS and self.game.legal_moves() & MOVE_BITS[move]:
+            return move
+        return self.fallback_move()
+
+    def iterative_deepening(self, search, time_budget, max_depth=None):
+        """Deepen search(depth, deadline) until time_budget seconds have passed.
+
+        Returns the move found by the deepest search that finished. Depth 1 always
+        runs to completion, so there is a move whenever the first level has one.
+        """
+        deadline = time.perf_counter() + time_budget
+        max_depth = max_depth or self.MAX_ITERATIVE_DEPTH
+        best_move = search(1, None)
+        depth = 2
+        while depth <= max_depth and time.perf_counter() < deadline:
+            try:
+                move = search(depth, deadline)
+            except SearchTimeout:
+                break
+            if move in DIRECTIONS:
+                best_move = move
+            depth += 1
+        return best_move
@@ -0,0 +1,37 @@
+"""
+Pygame renderer for the 2048 GUI.
+
+Importing this module initialises pygame, so only the interactive entry point
+(main.py) loads it, and only once a game window is actually needed.
+"""
+
+import pygame
+
+pygame.init()
+
+# Constants
+WIDTH, HEIGHT = 400, 400
+TILE_SIZE = WIDTH // 4
+FONT = pygame.font.Font(None, 40)
+
+def draw_board(screen, game):
+    """Draw the 2048 game board with grid lines."""
+    screen.fill((187, 173, 160))  # Background color
+
+    # Draw the tiles
+    for i in range(4):
+        for j in range(4):
+            tile = game.board[i][j]
+            rect = pygame.Rect(j * TILE_SIZE, i * TILE_SIZE, TILE_SIZE, TILE_SIZE)
+            pygame.draw.rect(screen, (205, 193, 180) if tile == 0 else (238, 228, 218), rect)
+            if tile != 0:
+                text = FONT.render(str(tile), True, (119, 110, 101))
+                screen.blit(text, text.get_rect(center=rect.center))
+
+    # Draw the grid lines
+    line_color = (119, 110, 101)  # Grey color for the grid lines
+    for i in range(1, 4):
+        pygame.draw.line(screen, line_color, (0, i * TILE_SIZE), (WIDTH, i * TILE_SIZE), 2)
+        pygame.draw.line(screen, line_color, (i * TILE_SIZE, 0), (i * TILE_SIZE, HEIGHT), 2)
+
+    pygame.display.flip()
@@ -0,0 +1,70 @@
+import time
+
+import numpy as np
+
+import batch_env
+import bitboard
+from game_logic import DIRECTIONS, draw_seed
+from player import Player
+
+
+class RolloutPlayer(Player):
+    """Pure Monte Carlo player: every legal move is scored by random playouts.
+
+    For each legal move, rollouts copies of the resulting board get a spawned
+    tile and are played on with random moves until the game ends. The move with
+    the highest mean score gained wins. All the playouts for all moves advance
+    together as one NumPy array (see batch_env.playout).
+    """
+
+    def __init__(self, game, rollouts=50, max_moves=None, seed=None, time_budget=None):
+        self.game = game
+        self.rollouts = rollouts  # Playouts per legal move in each batch
+        self.max_moves = max_moves  # Playout length cap; None plays to game over
+        self.time_budget = time_budget  # Seconds per move, for as many batches as fit; None plays one
+        # Without a seed, one is drawn from the game's rng, so seeded games replay exactly
+        self.rng = np.random.default_rng(draw_seed(game.rng) if seed is None else seed)
+
+    def root_boards(self):
+        """The game's board as a (1, 4, 4) exponent array."""
+        packed = bitboard.pack(self.game.board)
+        exponents = [(packed >> shift) & 0xF for shift in range(0, 64, 4)]
+        return np.array(exponents, dtype=np.uint8).reshape(1, 4, 4)
+
+    def rollout(self, moves, children, gains, deadline=None):
+        """Total score of one batch of playouts for every legal move, in moves order.
+
+        Playouts still going at the deadline are cut short; every move's playouts
+        advance together, so the moves are still compared on equal terms.
+        """
+        count = self.rollouts
+        boards = np.repeat(children, count, axis=0)
+        batch_env.spawn(boards, self.rng)
+        scores = batch_env.playout(boards, self.rng, self.max_moves, deadline)
+        if self.stats is not None:
+            self.stats.nodes_expanded += len(boards)
+        return scores.reshape(len(moves), count).sum(axis=1) + gains * count
+
+    def get_best_move(self):
+        """Return the move with the best mean playout score."""
+        deadline = None if self.time_budget is None else time.perf_counter() + self.time_budget
+        root = self.root_boards()
+        moves = []
+        children = []
+        gains = []
+        for direction in range(len(DIRECTIONS)):
+            new_boards, gained, changed = batch_env.slide(root, direction)
+            if changed[0]:
+                moves.append(direction)
+                children.append(new_boards[0])
+                gains.append(gained[0])
+        if not moves:
+            return None
+        children = np.array(children)
+        gains = np.array(gains)
+
+        totals = self.rollout(moves, children, gains, deadline)
+        if deadline is not None:
+            while time.perf_counter() < deadline:
+                totals += self.rollout(moves, children, gains, deadline)
+        return self.legal_move(DIRECTIONS[moves[int(totals.argmax())]])
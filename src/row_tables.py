@@ -0,0 +1,161 @@
+"""
+Precomputed move tables for every packed 4-tile row.
+
+A row is a 16-bit integer holding four 4-bit tile exponents, lowest nibble
+first (see bitboard.py). For each of the 65,536 possible rows the tables
+hold the row after sliding left or right and the score gained by the merge,
+which is the same in both directions. The tables are built once and cached
+next to the compiled modules so later imports only read them back. The cache
+carries a version and a checksum, and a sample of rows is recomputed on load;
+a cache failing any check is rebuilt.
+"""
+
+import os
+import struct
+import sys
+import zlib
+from array import array
+
+ROW_COUNT = 1 << 16
+MAX_EXPONENT = 15
+
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "__pycache__", "row_tables.bin")
+CACHE_MAGIC = b"2048ROWS"
+# Bump whenever the tables' layout or contents change, so older caches are rebuilt
+CACHE_VERSION = 1
+# Magic, version, MAX_EXPONENT and the CRC-32 of the table bytes that follow
+CACHE_HEADER = struct.Struct("<8sIII")
+# Rows recomputed on load as a check that the cache matches slide_row_left
+SAMPLE_ROWS = range(0, ROW_COUNT, 1021)
+
+
+def reverse_row(row):
+    """Reverse the order of the four nibbles in a 16-bit row."""
+    return (
+        ((row & 0x000F) << 12)
+        | ((row & 0x00F0) << 4)
+        | ((row & 0x0F00) >> 4)
+        | ((row & 0xF000) >> 12)
+    )
+
+
+def slide_row_left(row):
+    """Slide and merge a 16-bit row to the left, returning (row, gained)."""
+    tiles = [(row >> shift) & 0xF for shift in (0, 4, 8, 12)]
+    tiles = [tile for tile in tiles if tile]
+    merged = []
+    gained = 0
+    i = 0
+    while i < len(tiles):
+        if i + 1 < len(tiles) and tiles[i] == tiles[i + 1] and tiles[i] < MAX_EXPONENT:
+            merged.append(tiles[i] + 1)
+            gained += 1 << (tiles[i] + 1)
+            i += 2
+        else:
+            merged.append(tiles[i])
+            i += 1
+    result = 0
+    for j, tile in enumerate(merged):
+        result |= tile << (4 * j)
+    return result, gained
+
+
+def build_tables():
+    """Compute the left, right and score tables for all rows."""
+    row_left = array("H", bytes(2 * ROW_COUNT))
+    row_right = array("H", bytes(2 * ROW_COUNT))
+    row_score = array("I", bytes(4 * ROW_COUNT))
+    for row in range(ROW_COUNT):
+        result, gained = slide_row_left(row)
+        row_left[row] = result
+        row_score[row] = gained
+        row_right[reverse_row(row)] = reverse_row(result)
+    return row_left, row_right, row_score
+
+
+def _table_bytes(tables):
+    """The tables as little-endian bytes, in cache order."""
+    data = b""
+    for table in tables:
+        if sys.byteorder != "little":
+            table = array(table.typecode, table)
+            table.byteswap()
+        data += table.tobytes()
+    return data
+
+
+def _matches_slide(tables):
+    """Check a sample of rows in the tables against slide_row_left, to catch stale caches."""
+    row_left, row_right, row_score = tables
+    for row in SAMPLE_ROWS:
+        result, gained = slide_row_left(row)
+        if (
+            row_left[row] != result
+            or row_score[row] != gained
+            or row_right[reverse_row(row)] != reverse_row(result)
+        ):
+            return False
+    return True
+
+
+def _load_cache(path):
+    """Read the tables from the cache file, or return None if unusable."""
+    try:
+        with open(path, "rb") as f:
+            header = f.read(CACHE_HEADER.size)
+            data = f.read()
+    except OSError:
+        return None
+    if len(header) != CACHE_HEADER.size or len(data) != 8 * ROW_COUNT:
+        return None
+    magic, version, max_exponent, checksum = CACHE_HEADER.unpack(header)
+    if (magic, version, max_exponent) != (CACHE_MAGIC, CACHE_VERSION, MAX_EXPONENT):
+        return None
+    if zlib.crc32(data) != checksum:
+        return None
+
+    row_left = array("H", data[: 2 * ROW_COUNT])
+    row_right = array("H", data[2 * ROW_COUNT : 4 * ROW_COUNT])
+    row_score = array("I", data[4 * ROW_COUNT :])
+    if sys.byteorder != "little":
+        for table in (row_left, row_right, row_score):
+            table.byteswap()
+    tables = row_left, row_right, row_score
+    return tables if _matches_slide(tables) else None
+
+
+def _save_cache(path, tables):
+    """Write the tables to the cache file, ignoring unwritable locations."""
+    data = _table_bytes(tables)
+    header = CACHE_HEADER.pack(CACHE_MAGIC, CACHE_VERSION, MAX_EXPONENT, zlib.crc32(data))
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(temp_path, "wb") as f:
+            f.write(header)
+            f.write(data)
+        os.replace(temp_path, path)  # Atomic, so concurrent imports never see a partial file
+    except OSError:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+
+def load_tables(path=CACHE_PATH):
+    """Load the tables from the cache, building and caching them if needed."""
+    tables = _load_cache(path)
+    if tables is None:
+        tables = build_tables()
+        _save_cache(path, tables)
+    return tables
+
+
+# Plain lists index faster than arrays in the move loops.
+ROW_LEFT, ROW_RIGHT, ROW_SCORE = (table.tolist() for table in load_tables())
+
+# Bit 0 is set if sliding the row left changes it, bit 1 if sliding it right does.
+ROW_MOVES = [
+    (left != row) | ((right != row) << 1)
+    for row, (left, right) in enumerate(zip(ROW_LEFT, ROW_RIGHT))
+]
@@ -1,11 +1,16 @@
-import pygame
+import argparse
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from game_logic import Game2048
 from bfs_ai import BFSPlayer
-from dfs_ai import DFSPlayer
+from dfs_ai import DFSPlayer, PrunedDFSPlayer
 from astar_ai import AStarPlayer
-
-pygame.init()
+from expectimax_ai import ExpectimaxPlayer
+from mcts_ai import MCTSPlayer
+from rollout_ai import RolloutPlayer
+from ntuple_ai import NTuplePlayer
+from stats import SearchStats, aggregate, format_totals
 
 def get_all_heuristics():
     """Return a dictionary of all available heuristics for A*."""
@@ -16,57 +21,105 @@ def get_all_heuristics():
         "Clustering": "clustering"
     }
 
-def run_game(player_type, heuristic=None):
-    """Run a single game using the specified AI strategy and return the final score."""
-    game = Game2048()
+def run_game(player_type, heuristic=None, seed=None, time_budget=None, stats=None):
+    """Run a single game using the specified AI strategy and return the final score.
+
+    Pass a stats.SearchStats to have the player record its search work for every move.
+    """
+    game = Game2048(seed)
     
     # Instantiate the strategy dynamically, including heuristic choice for A*
     if heuristic:
-        player = player_type(game, heuristic)
+        player = player_type(game, heuristic, time_budget=time_budget)
     else:
-        player = player_type(game)
+        player = player_type(game, time_budget=time_budget)
+    player.stats = stats
 
     while not game.is_game_over():
+        if stats is not None:
+            stats.begin_move()
         best_move = player.get_best_move()
+        if stats is not None:
+            stats.end_move()
 
-        if best_move in ["left", "right", "up", "down"]:
-            getattr(game, f"move_{best_move}")()  # Execute the valid move
-        else:
-            print(f"Invalid move: {best_move}")
-            break  # Stop if an invalid move is returned
+        # Players return a legal move until the game is over, so every game is played out
+        game.move(best_move)
 
     return game.score  # Return the final score
 
-def run_all_strategies(runs_per_strategy):
-    """Run BFS, DFS, and all A* heuristics multiple times and calculate the average score."""
+def play_job(job, time_budget=None, collect_stats=False):
+    """Play one (name, strategy, heuristic, run, seed) job.
+
+    Returns (score, stats totals for the game, or None unless collect_stats is set).
+    """
+    _, player_type, heuristic, _, seed = job
+    stats = SearchStats() if collect_stats else None
+    score = run_game(player_type, heuristic, seed, time_budget, stats)
+    return score, stats.totals() if stats is not None else None
+
+def build_jobs(runs_per_strategy, base_seed=0):
+    """List every game to play, in reporting order.
+
+    Run i of every strategy uses seed base_seed + i, so strategies are compared on the
+    same sequence of games.
+    """
     strategies = {
         "BFS": BFSPlayer,
-        "DFS": DFSPlayer
+        "DFS": DFSPlayer,
+        "Pruned DFS": PrunedDFSPlayer,
+        "Expectimax": ExpectimaxPlayer,
+        "MCTS": MCTSPlayer,
+        "Rollout": RolloutPlayer,
+        "N-tuple": NTuplePlayer
     }
 
-    heuristics = get_all_heuristics()  # Get all A* heuristics
-    total_scores = {name: 0 for name in strategies}
-    total_scores.update({f"A* ({h})": 0 for h in heuristics})  # Track scores for all heuristics
-    results = {name: [] for name in strategies}
-    results.update({f"A* ({h})": [] for h in heuristics})
-
-    # Run BFS and DFS strategies
+    jobs = []
     for name, strategy in strategies.items():
         for i in range(runs_per_strategy):
-            print(f"Running {name} Strategy - Run {i + 1}")
-            score = run_game(strategy)
-            total_scores[name] += score
-            results[name].append(score)
-            print(f"Result: {name} - Run {i + 1} - Final Score: {score}")
-
-    # Run A* strategy for each heuristic
-    for heuristic_name, heuristic_key in heuristics.items():
-        for i in range(runs_per_strategy):
-            print(f"Running A* ({heuristic_name}) - Run {i + 1}")
-            score = run_game(AStarPlayer, heuristic_key)
-            total_scores[f"A* ({heuristic_name})"] += score
-            results[f"A* ({heuristic_name})"].append(score)
-            print(f"Result: A* ({heuristic_name}) - Run {i + 1} - Final Score: {score}")
+            jobs.append((name, strategy, None, i, base_seed + i))
+
+    # Run DFS with each heuristic scoring its leaves, and A* with each heuristic
+    for label, strategy in (("DFS", DFSPlayer), ("A*", AStarPlayer)):
+        for heuristic_name, heuristic_key in get_all_heuristics().items():
+            for i in range(runs_per_strategy):
+                jobs.append((f"{label} ({heuristic_name})", strategy, heuristic_key, i, base_seed + i))
+    return jobs
+
+def run_all_strategies(runs_per_strategy, workers=1, base_seed=0, time_budget=None, collect_stats=False):
+    """Run BFS, DFS, pruned DFS, Expectimax, MCTS, Rollout, N-tuple and all DFS and A* heuristics multiple times and calculate the average score.
+
+    With more than one worker the games are spread across a process pool; results are
+    still collected and reported in job order. A time budget (seconds per move) makes
+    every player deepen its search iteratively instead of using a fixed depth. With
+    collect_stats, search counters are reported for every game and every strategy.
+    """
+    jobs = build_jobs(runs_per_strategy, base_seed)
+    play = partial(play_job, time_budget=time_budget, collect_stats=collect_stats)
+    results = {}
+    game_stats = {}
+    for name, _, _, _, _ in jobs:
+        results.setdefault(name, [])
+        game_stats.setdefault(name, [])
+
+    def record(job, outcome):
+        name, _, _, i, _ = job
+        score, totals = outcome
+        results[name].append(score)
+        print(f"Result: {name} - Run {i + 1} - Final Score: {score}")
+        if totals is not None:
+            game_stats[name].append(totals)
+            print(f"Stats: {name} - Run {i + 1} - {format_totals(totals)}")
+
+    if workers > 1:
+        print(f"Running {len(jobs)} games on {workers} worker processes")
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for job, outcome in zip(jobs, executor.map(play, jobs)):
+                record(job, outcome)
+    else:
+        for job in jobs:
+            name, _, _, i, _ = job
+            print(f"Running {name} - Run {i + 1}")
+            record(job, play(job))
 
     print("\nAll Results:")
     for name, scores in results.items():
@@ -74,10 +127,15 @@ def run_all_strategies(runs_per_strategy):
             print(f"{name} - Run {i}: Final Score = {score}")
 
     print("\nAverage Scores:")
-    for name, total in total_scores.items():
-        average_score = total / runs_per_strategy
+    for name, scores in results.items():
+        average_score = sum(scores) / runs_per_strategy
         print(f"{name}: Average Score = {average_score:.2f}")
 
+    if collect_stats:
+        print("\nSearch Stats:")
+        for name, totals in game_stats.items():
+            print(f"{name}: {format_totals(aggregate(totals))}")
+
 def get_runs_per_strategy():
     """Prompt the user to enter the number of runs per strategy."""
     while True:
@@ -90,8 +148,24 @@ def get_runs_per_strategy():
         except ValueError:
             print("Invalid input. Please enter a valid integer.")
 
+def parse_args(argv=None):
+    """Parse the batch runner's command-line options."""
+    parser = argparse.ArgumentParser(description="Run every 2048 AI strategy and compare scores.")
+    parser.add_argument("--runs", type=int, help="games per strategy (prompted for if omitted)")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes to play games on")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first run of every strategy")
+    parser.add_argument("--time-budget", type=float, help="seconds per move; searches deepen until it runs out")
+    parser.add_argument("--stats", action="store_true", help="report search counters per game and strategy")
+    return parser.parse_args(argv)
+
 if __name__ == "__main__":
-    runs_per_strategy = get_runs_per_strategy()
-    run_all_strategies(runs_per_strategy)
-    pygame.quit()
+    args = parse_args()
+    runs_per_strategy = args.runs if args.runs and args.runs > 0 else get_runs_per_strategy()
+    run_all_strategies(
+        runs_per_strategy,
+        workers=args.workers,
+        base_seed=args.seed,
+        time_budget=args.time_budget,
+        collect_stats=args.stats,
+    )
     sys.exit()
@@ -0,0 +1,90 @@
+"""
+Opt-in instrumentation for the search players.
+
+Attach a SearchStats to a player (player.stats = SearchStats()) and bracket
+each get_best_move() call with begin_move()/end_move(). Players bump the
+counters as they search; nothing is counted while player.stats is None.
+"""
+
+import time
+
+COUNTERS = (
+    "nodes_expanded",
+    "boards_generated",
+    "duplicate_boards",
+    "max_frontier",
+    "heuristic_calls",
+    "cache_hits",
+    "elapsed_ns",
+)
+
+
+class SearchStats:
+    """Per-move search counters for one game, plus their totals."""
+
+    def __init__(self):
+        self.moves = []  # One dict of counters per completed move
+        self.seen = set()  # Board keys generated during the current move
+        self.started_ns = None
+        for name in COUNTERS:
+            setattr(self, name, 0)
+
+    def begin_move(self):
+        """Start counting a new move."""
+        for name in COUNTERS:
+            setattr(self, name, 0)
+        self.seen = set()
+        self.started_ns = time.perf_counter_ns()
+
+    def end_move(self):
+        """Finish the current move and return its counters."""
+        self.elapsed_ns = time.perf_counter_ns() - self.started_ns
+        record = {name: getattr(self, name) for name in COUNTERS}
+        self.moves.append(record)
+        return record
+
+    def generated(self, key):
+        """Count a generated board, noting whether this move has produced it before."""
+        self.boards_generated += 1
+        if key in self.seen:
+            self.duplicate_boards += 1
+        else:
+            self.seen.add(key)
+
+    def frontier(self, size):
+        """Record the current size of the search frontier."""
+        if size > self.max_frontier:
+            self.max_frontier = size
+
+    def totals(self):
+        """Counters summed over every move (max_frontier is the largest seen)."""
+        return aggregate(self.moves)
+
+
+def aggregate(records):
+    """Combine counter dicts from moves or games into one, keeping the move count."""
+    totals = dict.fromkeys(COUNTERS, 0)
+    totals["moves"] = 0
+    for record in records:
+        for name in COUNTERS:
+            if name == "max_frontier":
+                totals[name] = max(totals[name], record[name])
+            else:
+                totals[name] += record[name]
+        totals["moves"] += record.get("moves", 1)
+    return totals
+
+
+def format_totals(totals):
+    """One-line summary of aggregated counters, with per-move averages."""
+    moves = totals["moves"] or 1
+    return (
+        f"moves={totals['moves']} "
+        f"nodes/move={totals['nodes_expanded'] / moves:.1f} "
+        f"boards/move={totals['boards_generated'] / moves:.1f} "
+        f"duplicates/move={totals['duplicate_boards'] / moves:.1f} "
+        f"heuristic/move={totals['heuristic_calls'] / moves:.1f} "
+        f"cache_hits/move={totals['cache_hits'] / moves:.1f} "
+        f"max_frontier={totals['max_frontier']} "
+        f"ms/move={totals['elapsed_ns'] / moves / 1e6:.3f}"
+    )
@@ -0,0 +1,176 @@
+"""
+Transposition table and search tree shared by the tree-search players.
+
+Boards are keyed by their packed 64-bit form (see bitboard.py), so the same
+position reached through different move orders is looked up instead of
+searched. Tables only serve transpositions within one move's search and are
+cleared between moves: without spawns every board searched has the tile sum of
+the turn it was searched on, and spawns searched on one turn were stored with
+one ply less than the next turn looks them up with.
+"""
+
+from collections import OrderedDict
+
+import bitboard
+
+
+class TranspositionTable:
+    """Bounded cache of board key -> (depth, value) with least-recently-used eviction.
+
+    With exact_depth a value only answers lookups for the depth it was searched
+    to. Otherwise deeper results also answer shallower lookups and are never
+    replaced by shallower ones, which suits searches whose values are estimates.
+    """
+
+    def __init__(self, capacity=200000, exact_depth=True):
+        self.capacity = capacity
+        self.exact_depth = exact_depth
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key, depth):
+        """Return the value stored for a board searched to this depth, or None."""
+        entry = self.entries.get(key)
+        if entry is not None and (entry[0] == depth or (entry[0] > depth and not self.exact_depth)):
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        return None
+
+    def store(self, key, depth, value):
+        """Store the value of a board searched to the given depth."""
+        entries = self.entries
+        entry = entries.get(key)
+        if entry is None or entry[0] <= depth or self.exact_depth:
+            entries[key] = (depth, value)
+        entries.move_to_end(key)
+        if len(entries) > self.capacity:
+            entries.popitem(last=False)
+
+    def clear(self):
+        """Drop every entry and reset the hit counters."""
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+class SearchTree:
+    """Boards reached by a fixed-depth search, linked to their parents.
+
+    Node 0 is the root. A node's value is the best score gained over exactly
+    the remaining moves below it, or -inf if no line of moves gets that far.
+    A board reached again at the same depth through another move order shares
+    the value of the first node for it instead of being expanded again (see
+    shared). Equal values are broken in favour of the line whose end was
+    settled first, so the order a search visits nodes in still decides ties.
+    """
+
+    def __init__(self, board, max_depth, key=bitboard.pack):
+        """Start a tree at board; key maps a board to its table key (None if boards are packed)."""
+        self.max_depth = max_depth
+        self.key = key
+        self.boards = [board]
+        self.keys = [key(board) if key else board]
+        self.parents = [-1]
+        self.moves = [None]
+        self.gains = [0]
+        self.depths = [0]
+        self.values = [None]
+        self.ranks = [None]
+        self.sources = [None]  # Index of the earlier node a shared node takes its value from
+        self.first = {}  # (key, depth) -> first node holding that board at that depth
+        self.settled = 0
+
+    def __len__(self):
+        return len(self.boards)
+
+    def add(self, parent, board, move, gained):
+        """Add a child of the given node and return its index."""
+        index = len(self.boards)
+        key = self.key(board) if self.key else board
+        depth = self.depths[parent] + 1
+        source = self.first.setdefault((key, depth), index)
+        self.boards.append(board)
+        self.keys.append(key)
+        self.parents.append(parent)
+        self.moves.append(move)
+        self.gains.append(gained)
+        self.depths.append(depth)
+        self.values.append(None)
+        self.ranks.append(None)
+        self.sources.append(source if source != index else None)
+        return index
+
+    def shared(self, index):
+        """True if the node repeats an earlier node's board at the same depth and needs no search."""
+        return self.sources[index] is not None
+
+    def remaining(self, index):
+        """Number of moves still to search below a node."""
+        return self.max_depth - self.depths[index]
+
+    def resolve(self, index, table=None):
+        """Settle leaves and cached nodes; return True if the node still needs expanding."""
+        if self.sources[index] is not None:
+            return False
+        remaining = self.remaining(index)
+        if remaining == 0:
+            self.settle(index, 0)
+            return False
+        if index and table is not None:
+            cached = table.get(self.keys[index], remaining)
+            if cached is not None:
+                self.settle(index, cached)
+                return False
+        return True
+
+    def settle(self, index, value):
+        """Fix the value of a node that will not be expanded."""
+        self.values[index] = value
+        self.ranks[index] = self.settled
+        self.settled += 1
+
+    def backup(self, table=None):
+        """Propagate leaf values to the root, caching every expanded node in the table.
+
+        Returns (best_move, best_gain) for the root, or (None, -inf) if no
+        line of moves reaches the full depth.
+        """
+        size = len(self.boards)
+        best_move = None
+        best = [float("-inf")] * size
+        best_rank = [size] * size
+
+        # Deepest level first; on each level, shared nodes after the nodes they copy
+        levels = [([], []) for _ in range(self.max_depth + 1)]
+        for index in range(1, size):
+            levels[self.depths[index]][self.sources[index] is not None].append(index)
+
+        for own, shared in reversed(levels):
+            for index in own + shared:
+                source = self.sources[index]
+                if source is None:
+                    if self.values[index] is None:  # Expanded here, so its children have all reported in
+                        self.values[index] = best[index]
+                        self.ranks[index] = best_rank[index]
+                        if table is not None:
+                            table.store(self.keys[index], self.remaining(index), best[index])
+                    source = index
+                value = self.values[source]
+                rank = self.ranks[source]
+                parent = self.parents[index]
+                candidate = self.gains[index] + value
+                if candidate > best[parent] or (candidate == best[parent] and rank < best_rank[parent]):
+                    best[parent] = candidate
+                    best_rank[parent] = rank
+                    if parent == 0:
+                        best_move = self.moves[index]
+
+        if best[0] == float("-inf"):
+            return None, best[0]
+        return best_move, best[0]